@@ -1,2 +1,21 @@
 from .seir_model import SEIR_model
-from .sir_model import SIR_model
\ No newline at end of file
+from .sir_model import SIR_model
+
+# The numpy based models are imported on first use, so that importing the
+# package (e.g. for the command-line runner) does not pay for numpy up front.
+_LAZY = {
+    'SEIR_batch': 'seir_batch',
+    'SIR_batch': 'sir_batch',
+    'SEIRV_batch': 'seirv_batch',
+    'SEIR_network': 'seir_network',
+    'SEIR_surrogate': 'surrogate',
+}
+
+def __getattr__(name):
+    if name in _LAZY:
+        import importlib
+        return getattr(importlib.import_module('.' + _LAZY[name], __name__), name)
+    raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+
+def __dir__():
+    return sorted(list(globals()) + list(_LAZY))
@@ -0,0 +1,247 @@
+# Copyright (C) 2020 BITJUNGLE Rune Mathisen
+# This code is licensed under a GPLv3 license
+# See http://www.gnu.org/licenses/gpl-3.0.html
+
+'''
+Command-line batch runner for scenario files.
+
+    comp_models scenario.json [more.json ...] -o results/ [--plot]
+
+A scenario file is JSON holding one scenario, a list of scenarios, or
+{"defaults": {...}, "scenarios": [...]} where every scenario is merged
+on top of the defaults. Scenario fields:
+
+    name          used for the output file names (default: file name + index)
+    model         "SEIR" (default) or "SIR"
+    N             total population; S_start defaults to N - E - I - R
+    S_start, E_start, I_start, R_start
+                  initial compartments (E_start only for SEIR)
+    R0 or beta    transmission; beta = R0 * gamma
+    gamma, sigma  rates (sigma only for SEIR)
+    R0_schedule   {"day": R0, ...} changes of R0 during the run, on whole days
+    I_threshold   minimum number of infectious (default 0)
+    t_max, dt     horizon and time step in days (dt defaults to 1)
+
+An R0 scheduled for day d is used from the update that starts on day d,
+as with set_schedule() of the batch models. The variable R0 example
+script instead changes R0 before the update that ends on day d, i.e. one
+day earlier.
+
+Scenarios with the same model and time step are run together as one
+batch. For each scenario a <name>.csv trajectory is written, plus one
+summary.csv for the whole run. numpy is only imported once there is
+something to simulate, and matplotlib only when --plot is given, so that
+frequent headless runs start quickly.
+'''
+
+import argparse
+import csv
+import json
+import math
+import os
+import sys
+from typing import Any, Dict, List, Optional
+
+Scenario = Dict[str, Any]
+
+_COMPARTMENTS = {'SEIR': ('S', 'E', 'I', 'R'), 'SIR': ('S', 'I', 'R')}
+_RATES = {'SEIR': ('gamma', 'sigma'), 'SIR': ('gamma',)}
+
+def _number(scenario: Scenario, key: str, default: Optional[float] = None) -> float:
+    if key not in scenario:
+        if default is None:
+            raise ValueError("scenario {!r} is missing {}".format(scenario['name'], key))
+        return default
+    try:
+        value = float(scenario[key])
+    except (TypeError, ValueError, OverflowError):
+        raise ValueError("scenario {!r}: {} must be a number".format(scenario['name'], key)) from None
+    if not math.isfinite(value):
+        raise ValueError("scenario {!r}: {} must be finite".format(scenario['name'], key))
+    return value
+
+def _check_name(name: str) -> str:
+    '''Scenario names become file names in the output directory.'''
+    if not name or name in ('.', '..') or any(char in name for char in '/\\\0') or name.lower() == 'summary':
+        raise ValueError("invalid scenario name {!r}: it must be a plain file name other than 'summary'".format(name))
+    return name
+
+def parse_scenario(raw: Dict[str, Any], name: str) -> Scenario:
+    '''Validate one scenario from a file and fill in derived values.'''
+    if not isinstance(raw, dict):
+        raise ValueError("scenario {!r} must be a JSON object".format(name))
+    scenario = {'name': _check_name(str(raw.get('name', name))), 'model': str(raw.get('model', 'SEIR')).upper()}
+    raw = dict(raw, name=scenario['name'])
+    if scenario['model'] not in _COMPARTMENTS:
+        raise ValueError("scenario {!r}: model must be SEIR or SIR".format(scenario['name']))
+    if scenario['model'] == 'SEIR':
+        scenario['E_start'] = _number(raw, 'E_start', 0.0)
+    scenario['I_start'] = _number(raw, 'I_start')
+    scenario['R_start'] = _number(raw, 'R_start', 0.0)
+    others = sum(scenario.get(key, 0.0) for key in ('E_start', 'I_start', 'R_start'))
+    if 'S_start' in raw:
+        scenario['S_start'] = _number(raw, 'S_start')
+    else:
+        scenario['S_start'] = _number(raw, 'N') - others
+    for key in _RATES[scenario['model']]:
+        scenario[key] = _number(raw, key)
+    if scenario['gamma'] <= 0 or scenario.get('sigma', 0.0) < 0:
+        raise ValueError("scenario {!r}: gamma must be positive and sigma non-negative".format(scenario['name']))
+    if 'beta' in raw:
+        scenario['R0'] = _number(raw, 'beta') / scenario['gamma']
+    else:
+        scenario['R0'] = _number(raw, 'R0')
+    scenario['I_threshold'] = _number(raw, 'I_threshold', 0.0)
+    scenario['t_max'] = _number(raw, 't_max')
+    scenario['dt'] = _number(raw, 'dt', 1.0)
+    if scenario['t_max'] <= 0 or scenario['dt'] <= 0:
+        raise ValueError("scenario {!r}: t_max and dt must be positive".format(scenario['name']))
+    try:
+        schedule = {float(day): float(R0) for day, R0 in raw.get('R0_schedule', {}).items()}
+    except (AttributeError, TypeError, ValueError, OverflowError):
+        raise ValueError("scenario {!r}: R0_schedule must map days to R0 values".format(scenario['name'])) from None
+    if not all(math.isfinite(day) and math.isfinite(R0) for day, R0 in schedule.items()):
+        raise ValueError("scenario {!r}: R0_schedule values must be finite".format(scenario['name']))
+    if not all(day >= 0 and day.is_integer() for day in schedule):
+        raise ValueError("scenario {!r}: R0_schedule days must be whole, non-negative days".format(scenario['name']))
+    scenario['R0_schedule'] = {int(day): R0 for day, R0 in sorted(schedule.items())}
+    scenario['num_iter'] = math.ceil(scenario['t_max'] / scenario['dt'])
+    return scenario
+
+def load_scenarios(path: str) -> List[Scenario]:
+    '''Read and validate all scenarios in a scenario file.'''
+    with open(path, mode='r') as fh:
+        try:
+            content = json.load(fh)
+        except json.JSONDecodeError as exc:
+            raise ValueError("{}: invalid JSON: {}".format(path, exc)) from None
+    defaults = {}
+    if isinstance(content, dict) and 'scenarios' in content:
+        defaults = content.get('defaults', {})
+        if not isinstance(defaults, dict):
+            raise ValueError("{}: defaults must be a JSON object".format(path))
+        content = content['scenarios']
+    entries = content if isinstance(content, list) else [content]
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return [parse_scenario(dict(defaults, **entry) if isinstance(entry, dict) else entry,
+                           stem if len(entries) == 1 else '{}_{}'.format(stem, idx))
+            for idx, entry in enumerate(entries)]
+
+def _column(scenarios: List[Scenario], key: str) -> List[Any]:
+    return [scenario[key] for scenario in scenarios]
+
+def _beta_schedule(scenarios: List[Scenario]) -> Any:
+    '''
+    Daily beta schedule of shape (days, len(scenarios)) for set_schedule():
+    row d holds the latest R0 scheduled at or before day d, times gamma.
+    '''
+    import numpy as np
+
+    days = 1 + max((day for scenario in scenarios for day in scenario['R0_schedule']), default=0)
+    table = np.empty((days, len(scenarios)))
+    for col, scenario in enumerate(scenarios):
+        table[:, col] = scenario['R0']
+        for day, R0 in scenario['R0_schedule'].items():
+            table[day:, col] = R0
+        table[:, col] *= scenario['gamma']
+    return table
+
+def run_scenarios(scenarios: List[Scenario], dtype: str = 'float64') -> Dict[str, Any]:
+    '''
+    Simulate the scenarios, batching those that share model and time
+    step, and return a (num_iter, compartments) trajectory for each name.
+    '''
+    import numpy as np
+    from .seir_batch import SEIR_batch
+    from .sir_batch import SIR_batch
+
+    groups = {}
+    for scenario in scenarios:
+        groups.setdefault((scenario['model'], scenario['dt']), []).append(scenario)
+    results = {}
+    for (model_name, dt), members in groups.items():
+        num_iter = max(_column(members, 'num_iter'))
+        beta = _beta_schedule(members)
+        starts = [_column(members, label + '_start') for label in _COMPARTMENTS[model_name]]
+        rates = [_column(members, key) for key in _RATES[model_name]]
+        model_class = SEIR_batch if model_name == 'SEIR' else SIR_batch
+        model = model_class(*starts, beta[0], *rates, _column(members, 'I_threshold'), dtype=dtype)
+        model.set_schedule('beta', beta)
+        out = np.stack(model.simulate(num_iter, dt), axis=1)
+        for col, scenario in enumerate(members):
+            results[scenario['name']] = out[:scenario['num_iter'], :, col]
+    return results
+
+def write_results(scenarios: List[Scenario], results: Dict[str, Any], output_dir: str) -> None:
+    '''Write one <name>.csv per scenario and a summary.csv.'''
+    os.makedirs(output_dir, exist_ok=True)
+    with open(os.path.join(output_dir, 'summary.csv'), mode='w', newline='') as summary_fh:
+        summary = csv.writer(summary_fh)
+        summary.writerow(['name', 'model', 'peak_I', 'peak_time', 'final_S', 'final_R', 'final_size'])
+        for scenario in scenarios:
+            compartments = _COMPARTMENTS[scenario['model']]
+            trajectory = results[scenario['name']]
+            with open(os.path.join(output_dir, scenario['name'] + '.csv'), mode='w', newline='') as fh:
+                writer = csv.writer(fh)
+                writer.writerow(('time',) + compartments)
+                for i, row in enumerate(trajectory.tolist()):
+                    writer.writerow([i * scenario['dt']] + row)
+            I = trajectory[:, compartments.index('I')]
+            peak = int(I.argmax())
+            summary.writerow([scenario['name'], scenario['model'], float(I[peak]), peak * scenario['dt'],
+                              float(trajectory[-1, 0]), float(trajectory[-1, -1]),
+                              float(trajectory[0].sum() - trajectory[-1, 0])])
+
+def plot_results(scenarios: List[Scenario], results: Dict[str, Any], output_dir: str) -> None:
+    '''Save a <name>.png plot per scenario. matplotlib is only imported here.'''
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    from .plotting import annotate_breakpoints, plot_series
+
+    for scenario in scenarios:
+        trajectory = results[scenario['name']]
+        fig, ax = plt.subplots()
+        plot_series({label: trajectory[:, idx] for idx, label in enumerate(_COMPARTMENTS[scenario['model']])},
+                    dt=scenario['dt'], ax=ax)
+        annotate_breakpoints(scenario['R0_schedule'], ax=ax)
+        ax.set_title("{} ({} model)".format(scenario['name'], scenario['model']))
+        ax.set_xlabel('Days')
+        ax.set_ylabel('Number of people')
+        ax.grid()
+        ax.legend()
+        fig.savefig(os.path.join(output_dir, scenario['name'] + '.png'))
+        plt.close(fig)
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog='comp_models', description="Run compartmental model scenarios from scenario files.")
+    parser.add_argument('scenario_files', nargs='+', metavar='SCENARIO', help="JSON scenario file")
+    parser.add_argument('-o', '--output-dir', default='.', help="directory for result files (default: current directory)")
+    parser.add_argument('--dtype', choices=('float64', 'float32'), default='float64', help="floating point precision of the simulation")
+    parser.add_argument('--plot', action='store_true', help="also save a plot per scenario (requires matplotlib)")
+    parser.add_argument('-q', '--quiet', action='store_true', help="do not print a line per scenario")
+    args = parser.parse_args(argv)
+
+    try:
+        scenarios = [scenario for path in args.scenario_files for scenario in load_scenarios(path)]
+        names = [scenario['name'] for scenario in scenarios]
+        duplicates = sorted({name for name in names if names.count(name) > 1})
+        if duplicates:
+            raise ValueError("duplicate scenario names: {}".format(', '.join(duplicates)))
+        results = run_scenarios(scenarios, args.dtype)
+        write_results(scenarios, results, args.output_dir)
+        if args.plot:
+            plot_results(scenarios, results, args.output_dir)
+    except (OSError, ValueError) as exc:
+        print("comp_models: error: {}".format(exc), file=sys.stderr)
+        return 2
+
+    if not args.quiet:
+        for scenario in scenarios:
+            final = results[scenario['name']][-1]
+            print("{}: {}".format(scenario['name'], ' - '.join(
+                '{}: {:.0f}'.format(label, value) for label, value in zip(_COMPARTMENTS[scenario['model']], final))))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
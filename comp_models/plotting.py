@@ -0,0 +1,125 @@
+# Copyright (C) 2020 BITJUNGLE Rune Mathisen
+# This code is licensed under a GPLv3 license
+# See http://www.gnu.org/licenses/gpl-3.0.html
+
+'''
+Plotting helpers for long model outputs and ensembles.
+
+Every series is downsampled with largest-triangle-three-buckets (LTTB)
+to at most max_points points before it is handed to matplotlib, so the
+render time and figure size stay bounded however fine dt is or however
+many ensemble members are summarised. matplotlib is only imported when
+no axes are passed in.
+'''
+
+from typing import Dict, Mapping, Optional, Sequence, Tuple, Union
+import numpy as np
+
+Breakpoints = Union[Mapping[float, float], Sequence[float]]
+
+def lttb(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    '''
+    Indices of the n_out points that largest-triangle-three-buckets keeps
+    of the series (x, y). The first and last point are always kept; in
+    between, one point is kept per bucket: the one forming the largest
+    triangle with the point kept in the previous bucket and the mean of
+    the next bucket. All indices are returned if n_out >= len(x).
+    '''
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = x.shape[0]
+    if y.shape[0] != n:
+        raise ValueError("x and y must have the same length")
+    if n_out >= n or n <= 2:
+        return np.arange(n)
+    if n_out < 3:
+        raise ValueError("n_out must be at least 3")
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    kept = np.empty(n_out, dtype=np.int64)
+    kept[0], kept[-1] = 0, n - 1
+    previous = 0
+    for bucket in range(n_out - 2):
+        start, stop = edges[bucket], edges[bucket + 1]
+        next_stop = edges[bucket + 2] if bucket + 2 < n_out - 1 else n
+        next_x = x[stop:next_stop].mean()
+        next_y = y[stop:next_stop].mean()
+        area = np.abs((x[previous] - next_x) * (y[start:stop] - y[previous])
+                      - (x[previous] - x[start:stop]) * (next_y - y[previous]))
+        previous = start + int(area.argmax())
+        kept[bucket + 1] = previous
+    return kept
+
+def downsample(x: np.ndarray, y: np.ndarray, n_out: int) -> Tuple[np.ndarray, np.ndarray]:
+    '''The LTTB reduced series (x, y), see lttb().'''
+    idx = lttb(x, y, n_out)
+    return np.asarray(x)[idx], np.asarray(y)[idx]
+
+def _axes(ax):
+    if ax is None:
+        import matplotlib.pyplot as plt
+        ax = plt.gca()
+    return ax
+
+def _time(num_points: int, x: Optional[np.ndarray], dt: float) -> np.ndarray:
+    if x is None:
+        return np.arange(num_points) * dt
+    x = np.asarray(x, dtype=np.float64)
+    if x.shape[0] != num_points:
+        raise ValueError("x must have one value per time step")
+    return x
+
+def plot_series(series: Dict[str, np.ndarray], x: Optional[np.ndarray] = None, dt: float = 1.0, max_points: int = 1000, ax=None, **kwargs):
+    '''
+    Plot model output such as {'Susceptible': S, 'Infectious': I}, each
+    series downsampled to max_points. The keys become the line labels,
+    x defaults to the time steps times dt, and further keyword arguments
+    go to ax.plot. Returns the axes.
+    '''
+    ax = _axes(ax)
+    for label, values in series.items():
+        values = np.asarray(values, dtype=np.float64)
+        ax.plot(*downsample(_time(values.shape[0], x, dt), values, max_points), label=label, **kwargs)
+    return ax
+
+def plot_fan(ensemble: np.ndarray, x: Optional[np.ndarray] = None, dt: float = 1.0, bands: Sequence[Tuple[float, float]] = ((0.05, 0.95), (0.25, 0.75)), max_points: int = 1000, color: Optional[str] = None, label: Optional[str] = None, ax=None):
+    '''
+    Quantile fan chart of an ensemble of shape (time, members), such as
+    a compartment from SEIR_batch.simulate. Each (low, high) pair in bands
+    is drawn as a shaded band, innermost darkest, around the median line.
+    The points kept are chosen by LTTB on the median and shared by all
+    bands. Returns the axes.
+    '''
+    ensemble = np.asarray(ensemble, dtype=np.float64)
+    if ensemble.ndim != 2:
+        raise ValueError("ensemble must have shape (time, members)")
+    ax = _axes(ax)
+    levels = sorted({q for band in bands for q in band} | {0.5})
+    quantiles = dict(zip(levels, np.quantile(ensemble, levels, axis=1)))
+    time = _time(ensemble.shape[0], x, dt)
+    idx = lttb(time, quantiles[0.5], max_points)
+    line, = ax.plot(time[idx], quantiles[0.5][idx], color=color, label=label)
+    widths = sorted(bands, key=lambda band: band[1] - band[0], reverse=True)
+    for depth, (low, high) in enumerate(widths, start=1):
+        ax.fill_between(time[idx], quantiles[low][idx], quantiles[high][idx], color=line.get_color(),
+                        alpha=0.6 * depth / len(widths), linewidth=0)
+    return ax
+
+def annotate_breakpoints(breakpoints: Breakpoints, label_format: Optional[str] = None, ax=None, **kwargs):
+    '''
+    Mark schedule breakpoints, e.g. the Rvals dict of the variable R0
+    example, with dashed vertical lines drawn as one collection. With
+    label_format (e.g. '$R_0$={:.2f}') and a mapping, each line is also
+    labelled with its value. Returns the axes.
+    '''
+    ax = _axes(ax)
+    days = list(breakpoints)
+    if not days:
+        return ax
+    style = dict(colors='silver', linestyles='--')
+    style.update(kwargs)
+    ax.vlines(days, 0, 1, transform=ax.get_xaxis_transform(), **style)
+    if label_format is not None and isinstance(breakpoints, Mapping):
+        for day, value in breakpoints.items():
+            ax.text(day, 1, label_format.format(value), transform=ax.get_xaxis_transform(),
+                    rotation=90, va='top', ha='right', fontsize='small', color='gray')
+    return ax
@@ -0,0 +1,89 @@
+# Copyright (C) 2020 BITJUNGLE Rune Mathisen
+# This code is licensed under a GPLv3 license
+# See http://www.gnu.org/licenses/gpl-3.0.html
+
+'''
+Accuracy drift of float32 against float64 batch simulations.
+
+float32 halves the memory traffic of SIR_batch/SEIR_batch ensembles. This
+module runs the reference scenarios from the example scripts as R0
+ensembles in both precisions and reports how far float32 drifts, so that
+it is clear when the saving is safe. Run it with:
+
+    python -m comp_models.precision
+'''
+
+import math
+from typing import Dict
+import numpy as np
+
+from .seir_batch import SEIR_batch
+from .sir_batch import SIR_batch
+
+# Parameters of the example scripts in examples/
+REFERENCE_SCENARIOS = {
+    'covid-19_SIR': {'model': 'SIR', 'S_start': 54990, 'I_start': 10, 'R_start': 0,
+                     'R0': 3.08, 'gamma': 1/10, 't_max': 180},
+    'covid-19_SEIR': {'model': 'SEIR', 'S_start': 54980, 'E_start': 10, 'I_start': 10, 'R_start': 0,
+                      'R0': 3.08, 'gamma': 1/10, 'sigma': 1/2.5, 't_max': 180},
+    'diamond_princess_SIR': {'model': 'SIR', 'S_start': 3699, 'I_start': 1, 'R_start': 0,
+                             'R0': 5.2, 'gamma': 1/14, 't_max': 90},
+    'diamond_princess_SEIR': {'model': 'SEIR', 'S_start': 3689, 'E_start': 10, 'I_start': 1, 'R_start': 0,
+                              'R0': 4.9, 'gamma': 1/14, 'sigma': 1/3.0, 't_max': 90},
+}
+
+def _run(scenario: Dict[str, float], R0: np.ndarray, dt: float, dtype: type) -> np.ndarray:
+    beta = R0 * scenario['gamma']
+    num_iter = math.ceil(scenario['t_max'] / dt)
+    if scenario['model'] == 'SIR':
+        model = SIR_batch(scenario['S_start'], scenario['I_start'], scenario['R_start'],
+                          beta, scenario['gamma'], dtype=dtype)
+    else:
+        model = SEIR_batch(scenario['S_start'], scenario['E_start'], scenario['I_start'], scenario['R_start'],
+                           beta, scenario['gamma'], scenario['sigma'], dtype=dtype)
+    return np.stack(model.simulate(num_iter, dt))
+
+def precision_drift(members: int = 256, spread: float = 0.5, dt: float = 1.0, tolerance: float = 1e-4) -> Dict[str, Dict[str, float]]:
+    '''
+    Run every reference scenario as an ensemble of `members` R0 values
+    within +/- `spread` of its reference R0, in float32 and float64.
+
+    Returns, per scenario, the largest absolute difference in any
+    compartment, that difference relative to the population N, the largest
+    relative errors in peak infectious and final size, the state memory per
+    member for both dtypes, and whether the relative error is within
+    `tolerance`.
+    '''
+    report = {}
+    for name, scenario in REFERENCE_SCENARIOS.items():
+        R0 = scenario['R0'] * np.linspace(1 - spread, 1 + spread, members)
+        exact = _run(scenario, R0, dt, np.float64)
+        approx = _run(scenario, R0, dt, np.float32).astype(np.float64)
+        N = exact[:, 0].sum(axis=0)
+        I = exact[-2]
+        peak = I.max(axis=0)
+        final = N - exact[0, -1]
+        max_abs_error = float(np.abs(approx - exact).max())
+        max_rel_error = float((np.abs(approx - exact).max(axis=(0, 1)) / N).max())
+        report[name] = {
+            'max_abs_error': max_abs_error,
+            'max_rel_error': max_rel_error,
+            'peak_I_rel_error': float((np.abs(approx[-2].max(axis=0) - peak) / peak).max()),
+            'final_size_rel_error': float((np.abs((N - approx[0, -1]) - final) / final).max()),
+            'bytes_per_member_float64': exact.shape[0] * np.dtype(np.float64).itemsize,
+            'bytes_per_member_float32': exact.shape[0] * np.dtype(np.float32).itemsize,
+            'safe': max_rel_error <= tolerance,
+        }
+    return report
+
+def main() -> None:
+    report = precision_drift()
+    print("{:<24}{:>14}{:>14}{:>14}{:>14}  {}".format(
+        'scenario', 'max abs err', 'max rel err', 'peak I err', 'final err', 'float32 safe'))
+    for name, row in report.items():
+        print("{:<24}{:>14.3g}{:>14.3g}{:>14.3g}{:>14.3g}  {}".format(
+            name, row['max_abs_error'], row['max_rel_error'],
+            row['peak_I_rel_error'], row['final_size_rel_error'], row['safe']))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+# Copyright (C) 2020 BITJUNGLE Rune Mathisen
+# This code is licensed under a GPLv3 license
+# See http://www.gnu.org/licenses/gpl-3.0.html
+
+from typing import Tuple, Union
+import numpy as np
+
+ArrayLike = Union[float, np.ndarray]
+
+class _Batch:
+    '''
+    Storage and daily rate schedules shared by the batch models. The state
+    is one contiguous (compartments, size) block and the parameters one
+    (parameters, size) block; subclasses bind views of their rows to
+    names and implement update(). _RATE_ROWS maps the rate names that
+    can be scheduled to their parameter rows.
+    '''
+    _RATE_ROWS = {}
+
+    def _allocate(self, starts: Tuple[ArrayLike, ...], params: Tuple[ArrayLike, ...], dtype: type, scratch_rows: int = 3) -> None:
+        self._dtype = _check_dtype(dtype)
+        values = np.broadcast_arrays(*(np.atleast_1d(np.asarray(v, dtype=np.float64)) for v in starts + params))
+        if values[0].ndim != 1:
+            raise ValueError("{} parameters must be scalars or 1-D arrays".format(type(self).__name__))
+        size = values[0].shape[0]
+        self._state = np.array(values[:len(starts)], dtype=self._dtype)
+        self._params = np.array(values[len(starts):], dtype=self._dtype)
+        self._N = self._state.sum(axis=0)
+        self._scratch = np.empty((scratch_rows, size), dtype=self._dtype)
+        self._below = np.empty(size, dtype=bool)
+        self._schedules = {}
+        self._day = None
+        self._time = 0
+
+    def set_schedule(self, name: str, values: np.ndarray) -> None:
+        '''
+        Give a rate a daily schedule, applied inside update(): row d is
+        used for the updates that start on day d, and the last row holds
+        after the schedule ends. values has shape (days,) for the same
+        schedule in every column, or (days, size) for one per column.
+        A schedule overrides values assigned through the rate setters.
+        '''
+        if name not in self._RATE_ROWS:
+            raise ValueError("unknown rate {!r}, expected one of {}".format(name, ', '.join(self._RATE_ROWS)))
+        values = np.asarray(values, dtype=self._dtype)
+        if values.ndim == 1:
+            values = values[:, np.newaxis]
+        if values.ndim != 2 or values.shape[0] == 0 or values.shape[1] not in (1, self.size):
+            raise ValueError("schedule must have shape (days,) or (days, {})".format(self.size))
+        self._schedules[name] = np.ascontiguousarray(np.broadcast_to(values, (values.shape[0], self.size)))
+        self._day = None
+
+    def clear_schedule(self, name: str) -> None:
+        '''Stop applying the schedule of a rate; its current value is kept.'''
+        self._schedules.pop(name, None)
+
+    def _apply_schedules(self) -> None:
+        if not self._schedules:
+            return
+        day = int(np.floor(self._time + 1e-9))
+        if day != self._day:
+            self._day = day
+            for name, values in self._schedules.items():
+                np.copyto(self._params[self._RATE_ROWS[name]], values[min(day, values.shape[0] - 1)])
+
+    def simulate(self, num_iter: int, dt: float) -> Tuple[np.ndarray, ...]:
+        '''
+        Run num_iter - 1 updates and return one trajectory per row of the
+        state block, in the order of its rows, each of shape
+        (num_iter, size) in the model dtype. Row 0 holds the current
+        state, as in the example scripts.
+        '''
+        out = np.empty((self._state.shape[0], num_iter, self.size), dtype=self._dtype)
+        out[:, 0] = self._state
+        for i in range(1, num_iter):
+            self.update(dt)
+            out[:, i] = self._state
+        return tuple(out)
+
+    @property
+    def state(self) -> np.ndarray:
+        '''The (compartments, size) state block, one row per compartment.'''
+        return self._state
+
+    @property
+    def N(self) -> np.ndarray:
+        return self._N
+
+    @property
+    def size(self) -> int:
+        return self._state.shape[1]
+
+    @property
+    def dtype(self) -> np.dtype:
+        return self._dtype
+
+    @property
+    def time(self) -> float:
+        return self._time
+
+class SEIR_batch(_Batch):
+    '''
+    Vectorized SEIR model advancing many independent scenarios at once.
+
+    Every start value and rate may be a scalar or a 1-D array; they are
+    broadcast to a common batch size. Each column of the batch follows
+    the same update rule as SEIR_model, so column k of a batch gives the
+    same numbers as a single SEIR_model run with the k-th parameters.
+
+    The state is kept as one contiguous structure-of-arrays block of shape
+    (4, size) in the chosen dtype (float64 or float32), and update() works
+    in place on preallocated scratch rows. S, E, I and R are views into
+    that block and change as the model is updated.
+
+    The rates can follow daily schedules (see set_schedule), e.g. a
+    varying R0 applied as beta = R0 * gamma.
+    '''
+    _RATE_ROWS = {'beta': 0, 'gamma': 1, 'sigma': 2}
+
+    def __init__(self, S_start: ArrayLike, E_start: ArrayLike, I_start: ArrayLike, R_start: ArrayLike, beta: ArrayLike, gamma: ArrayLike, sigma: ArrayLike, I_threshold: ArrayLike = 0.0, dtype: type = np.float64):
+        self._allocate((S_start, E_start, I_start, R_start), (beta, gamma, sigma, I_threshold), dtype)
+        self._S, self._E, self._I, self._R = self._state
+        self._beta, self._gamma, self._sigma, self._I_threshold = self._params
+
+    def update(self, dt: float) -> None:
+        # Same sequential Euler scheme as SEIR_model: each compartment
+        # is updated with the already updated values of the previous ones.
+        self._apply_schedules()
+        contact, flow, outflow = self._scratch
+        np.multiply(self._beta, self._I, out=contact)
+        contact /= self._N
+        contact *= dt
+        np.multiply(contact, self._S, out=flow)
+        self._S -= flow
+        np.multiply(contact, self._S, out=flow)
+        np.multiply(self._sigma, self._E, out=outflow)
+        outflow *= dt
+        self._E += flow
+        self._E -= outflow
+        np.multiply(self._sigma, self._E, out=flow)
+        flow *= dt
+        np.multiply(self._gamma, self._I, out=outflow)
+        outflow *= dt
+        self._I += flow
+        self._I -= outflow
+        np.multiply(self._gamma, self._I, out=flow)
+        flow *= dt
+        self._R += flow
+        self._time += dt
+        np.less(self._I, self._I_threshold, out=self._below)
+        if self._below.any():
+            np.subtract(self._I_threshold, self._I, out=flow)
+            flow *= 0.5
+            flow *= self._below
+            self._E += flow
+            self._R += flow
+            np.copyto(self._I, self._I_threshold, where=self._below)
+
+    @property
+    def S(self) -> np.ndarray:
+        return self._S
+
+    @property
+    def E(self) -> np.ndarray:
+        return self._E
+
+    @property
+    def I(self) -> np.ndarray:
+        return self._I
+
+    @property
+    def R(self) -> np.ndarray:
+        return self._R
+
+    @property
+    def SEIR(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        return self._S, self._E, self._I, self._R
+
+    @property
+    def R0(self) -> np.ndarray:
+        return self._beta / self._gamma
+
+    @property
+    def beta(self) -> np.ndarray:
+        return self._beta
+
+    @beta.setter
+    def beta(self, beta: ArrayLike) -> None:
+        self._beta[...] = beta
+
+    @property
+    def gamma(self) -> np.ndarray:
+        return self._gamma
+
+    @gamma.setter
+    def gamma(self, gamma: ArrayLike) -> None:
+        self._gamma[...] = gamma
+
+    @property
+    def sigma(self) -> np.ndarray:
+        return self._sigma
+
+    @sigma.setter
+    def sigma(self, sigma: ArrayLike) -> None:
+        self._sigma[...] = sigma
+
+def _check_dtype(dtype: type) -> np.dtype:
+    dtype = np.dtype(dtype)
+    if dtype not in (np.float32, np.float64):
+        raise ValueError("dtype must be float32 or float64")
+    return dtype
+
+if __name__ == "__main__":
+    pass
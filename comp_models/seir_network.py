@@ -0,0 +1,236 @@
+# Copyright (C) 2020 BITJUNGLE Rune Mathisen
+# This code is licensed under a GPLv3 license
+# See http://www.gnu.org/licenses/gpl-3.0.html
+
+from typing import Optional, Sequence, Tuple, Union
+import numpy as np
+
+NodeSet = Union[Sequence[int], np.ndarray, None]
+
+class SEIR_network:
+    '''
+    SEIR model on a contact network for heterogeneous populations.
+
+    Drops the homogeneous mixing assumption of SEIR_model: node j is only
+    exposed to infection from its neighbours in the contact graph. The
+    graph is stored as CSR adjacency (indptr, indices, weights), where row
+    j lists the nodes that can infect j and the weight scales the contact
+    intensity. The infection pressure on every node is computed as one
+    sparse matrix-vector product per step, beta * A @ I.
+
+    Two modes are supported:
+    'mean_field' - deterministic; each node carries probabilities of being
+                   in S, E, I and R (individual-based mean-field).
+    'stochastic' - each node is in exactly one compartment and moves on
+                   with probability 1 - exp(-rate * dt).
+
+    On a complete graph with weights 1/N the mean-field mode reduces to
+    the homogeneous SEIR_model.
+    '''
+    _MODES = ('mean_field', 'stochastic')
+
+    def __init__(self, indptr: np.ndarray, indices: np.ndarray, weights: Optional[np.ndarray], E_start: NodeSet, I_start: NodeSet, beta: float, gamma: float, sigma: float, R_start: NodeSet = None, mode: str = 'mean_field', seed: Optional[int] = None):
+        if mode not in self._MODES:
+            raise ValueError("mode must be one of {}".format(', '.join(self._MODES)))
+        self._indptr = np.asarray(indptr)
+        self._indices = np.asarray(indices)
+        num_nodes = self._indptr.shape[0] - 1
+        if num_nodes < 1 or self._indptr[-1] != self._indices.shape[0]:
+            raise ValueError("indptr and indices do not describe a CSR matrix")
+        if self._indices.size and (self._indices.min() < 0 or self._indices.max() >= num_nodes):
+            raise ValueError("CSR indices out of range")
+        self._weights = None if weights is None else np.asarray(weights, dtype=np.float64)
+        if self._weights is not None and self._weights.shape != self._indices.shape:
+            raise ValueError("weights must have one entry per edge")
+        # Rows with at least one neighbour, and where they start, for reduceat
+        self._nonempty = self._indptr[:-1] < self._indptr[1:]
+        self._starts = self._indptr[:-1][self._nonempty]
+        self._beta = beta
+        self._gamma = gamma
+        self._sigma = sigma
+        self._mode = mode
+        self._rng = np.random.default_rng(seed)
+        self._time = 0
+
+        state = np.zeros(num_nodes, dtype=np.int8)
+        for compartment, nodes in ((3, R_start), (1, E_start), (2, I_start)):
+            if nodes is not None:
+                state[np.asarray(nodes, dtype=np.int64)] = compartment
+        if mode == 'stochastic':
+            self._state = state
+        else:
+            self._prob = np.zeros((4, num_nodes))
+            self._prob[state, np.arange(num_nodes)] = 1.0
+
+    @classmethod
+    def from_edges(cls, num_nodes: int, source: np.ndarray, target: np.ndarray, weights: Optional[np.ndarray] = None, directed: bool = False, **kwargs) -> 'SEIR_network':
+        '''
+        Build the model from an edge list. An edge source -> target means
+        that source can infect target; undirected edges work both ways.
+        Remaining keyword arguments are passed on to the constructor.
+        '''
+        indptr, indices, weights = edges_to_csr(num_nodes, source, target, weights, directed)
+        return cls(indptr, indices, weights, **kwargs)
+
+    def _matvec(self, x: np.ndarray) -> np.ndarray:
+        '''Sparse product A @ x on the CSR arrays.'''
+        y = np.zeros(x.shape[0])
+        if self._starts.size:
+            contributions = x[self._indices]
+            if self._weights is not None:
+                contributions = contributions * self._weights
+            y[self._nonempty] = np.add.reduceat(contributions, self._starts)
+        return y
+
+    def pressure(self) -> np.ndarray:
+        '''Force of infection acting on each node, beta * A @ I.'''
+        if self._mode == 'stochastic':
+            infectious = (self._state == 2).astype(np.float64)
+        else:
+            infectious = self._prob[2]
+        return self._beta * self._matvec(infectious)
+
+    def update(self, dt: float) -> None:
+        if self._mode == 'stochastic':
+            self._update_stochastic(dt)
+        else:
+            self._update_mean_field(dt)
+        self._time += dt
+
+    def _update_mean_field(self, dt: float) -> None:
+        s, e, i, r = self._prob
+        infection = np.minimum(self.pressure() * dt, 1.0) * s
+        onset = min(self._sigma * dt, 1.0) * e
+        removal = min(self._gamma * dt, 1.0) * i
+        s -= infection
+        e += infection - onset
+        i += onset - removal
+        r += removal
+
+    def _update_stochastic(self, dt: float) -> None:
+        state = self._state
+        susceptible = np.flatnonzero(state == 0)
+        exposed = np.flatnonzero(state == 1)
+        infectious = np.flatnonzero(state == 2)
+        if infectious.size and susceptible.size:
+            p_infection = -np.expm1(-self.pressure()[susceptible] * dt)
+            state[susceptible[self._rng.random(susceptible.size) < p_infection]] = 1
+        if exposed.size:
+            state[exposed[self._rng.random(exposed.size) < -np.expm1(-self._sigma * dt)]] = 2
+        if infectious.size:
+            state[infectious[self._rng.random(infectious.size) < -np.expm1(-self._gamma * dt)]] = 3
+
+    def simulate(self, num_iter: int, dt: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        '''
+        Run num_iter - 1 updates and return the S, E, I and R totals,
+        each of length num_iter, with row 0 holding the current state.
+        '''
+        out = np.empty((4, num_iter))
+        out[:, 0] = self.SEIR
+        for step in range(1, num_iter):
+            self.update(dt)
+            out[:, step] = self.SEIR
+        return out[0], out[1], out[2], out[3]
+
+    def _total(self, compartment: int) -> float:
+        if self._mode == 'stochastic':
+            return float(np.count_nonzero(self._state == compartment))
+        return float(self._prob[compartment].sum())
+
+    @property
+    def node_state(self) -> np.ndarray:
+        '''
+        Per node compartment: codes 0-3 (S, E, I, R) in stochastic mode,
+        or a (4, num_nodes) array of probabilities in mean-field mode.
+        '''
+        return self._state if self._mode == 'stochastic' else self._prob
+
+    @property
+    def S(self) -> float:
+        return self._total(0)
+
+    @property
+    def E(self) -> float:
+        return self._total(1)
+
+    @property
+    def I(self) -> float:
+        return self._total(2)
+
+    @property
+    def R(self) -> float:
+        return self._total(3)
+
+    @property
+    def SEIR(self) -> Tuple[float, float, float, float]:
+        return self.S, self.E, self.I, self.R
+
+    @property
+    def N(self) -> int:
+        return self._indptr.shape[0] - 1
+
+    @property
+    def num_edges(self) -> int:
+        return self._indices.shape[0]
+
+    @property
+    def mode(self) -> str:
+        return self._mode
+
+    @property
+    def beta(self) -> float:
+        return self._beta
+
+    @beta.setter
+    def beta(self, beta: float) -> None:
+        self._beta = beta
+
+    @property
+    def gamma(self) -> float:
+        return self._gamma
+
+    @gamma.setter
+    def gamma(self, gamma: float) -> None:
+        self._gamma = gamma
+
+    @property
+    def sigma(self) -> float:
+        return self._sigma
+
+    @sigma.setter
+    def sigma(self, sigma: float) -> None:
+        self._sigma = sigma
+
+    @property
+    def time(self) -> float:
+        return self._time
+
+def edges_to_csr(num_nodes: int, source: np.ndarray, target: np.ndarray, weights: Optional[np.ndarray] = None, directed: bool = False) -> Tuple[np.ndarray, np.ndarray, Optional[np.ndarray]]:
+    '''
+    Convert an edge list to the CSR arrays used by SEIR_network, with one
+    row per target node. Node indices use int32 when they fit, to keep
+    graphs with millions of edges compact.
+    '''
+    source = np.asarray(source, dtype=np.int64)
+    target = np.asarray(target, dtype=np.int64)
+    if source.shape != target.shape:
+        raise ValueError("source and target must have the same length")
+    if weights is not None:
+        weights = np.asarray(weights, dtype=np.float64)
+        if weights.shape != source.shape:
+            raise ValueError("weights must have one entry per edge")
+    if not directed:
+        source, target = np.concatenate((source, target)), np.concatenate((target, source))
+        if weights is not None:
+            weights = np.concatenate((weights, weights))
+    if source.size and (min(source.min(), target.min()) < 0 or max(source.max(), target.max()) >= num_nodes):
+        raise ValueError("edge endpoints out of range")
+    order = np.argsort(target, kind='stable')
+    index_type = np.int32 if num_nodes <= np.iinfo(np.int32).max else np.int64
+    indices = source[order].astype(index_type)
+    indptr = np.zeros(num_nodes + 1, dtype=np.int64)
+    np.cumsum(np.bincount(target, minlength=num_nodes), out=indptr[1:])
+    return indptr, indices, None if weights is None else weights[order]
+
+if __name__ == "__main__":
+    pass
@@ -0,0 +1,103 @@
+# Copyright (C) 2020 BITJUNGLE Rune Mathisen
+# This code is licensed under a GPLv3 license
+# See http://www.gnu.org/licenses/gpl-3.0.html
+
+from typing import Tuple
+import numpy as np
+from .seir_batch import ArrayLike, SEIR_batch
+
+class SEIRV_batch(SEIR_batch):
+    '''
+    Vectorized SEIRV/SEIRS model: SEIR_batch with vaccination and waning
+    immunity.
+
+    Two flows are added to the SEIR dynamics:
+    vaccination - a daily capacity of doses moving people from S to V.
+                  Only susceptible people are vaccinated, so fewer doses
+                  are given once S runs out.
+    omega       - the rate of waning immunity, moving people from R back
+                  to S (SEIRS).
+
+    With vaccination = omega = 0 the model approaches SEIR_batch as dt
+    gets small (see update() for the difference at larger steps). beta,
+    gamma, sigma, vaccination and omega can all follow daily schedules
+    (see set_schedule), which are applied inside update(), so whole
+    vaccine rollout strategies can be compared as one batch. The state
+    block has shape (5, size) with rows S, E, I, R, V, and simulate()
+    returns the five trajectories in that order.
+    '''
+    _RATE_ROWS = dict(SEIR_batch._RATE_ROWS, vaccination=4, omega=5)
+
+    def __init__(self, S_start: ArrayLike, E_start: ArrayLike, I_start: ArrayLike, R_start: ArrayLike, V_start: ArrayLike, beta: ArrayLike, gamma: ArrayLike, sigma: ArrayLike, vaccination: ArrayLike = 0.0, omega: ArrayLike = 0.0, I_threshold: ArrayLike = 0.0, dtype: type = np.float64):
+        self._allocate((S_start, E_start, I_start, R_start, V_start),
+                       (beta, gamma, sigma, I_threshold, vaccination, omega), dtype, scratch_rows=5)
+        self._S, self._E, self._I, self._R, self._V = self._state
+        self._beta, self._gamma, self._sigma, self._I_threshold, self._vaccination, self._omega = self._params
+
+    def update(self, dt: float) -> None:
+        # Unlike the sequential scheme of SEIR_model, every flow is computed
+        # from the state at the start of the step and moved as a whole from
+        # one compartment to the next. The sequential scheme does not
+        # conserve N, which adds up over the long, recurring epidemics
+        # that waning immunity gives.
+        self._apply_schedules()
+        infection, onset, removal, waning, doses = self._scratch
+        np.multiply(self._beta, self._I, out=infection)
+        infection /= self._N
+        infection *= dt
+        infection *= self._S
+        np.multiply(self._sigma, self._E, out=onset)
+        onset *= dt
+        np.multiply(self._gamma, self._I, out=removal)
+        removal *= dt
+        np.multiply(self._omega, self._R, out=waning)
+        waning *= dt
+        np.multiply(self._vaccination, dt, out=doses)
+        self._S -= infection
+        np.minimum(doses, self._S, out=doses)
+        np.maximum(doses, 0.0, out=doses)
+        self._S -= doses
+        self._S += waning
+        self._E += infection
+        self._E -= onset
+        self._I += onset
+        self._I -= removal
+        self._R += removal
+        self._R -= waning
+        self._V += doses
+        self._time += dt
+        np.less(self._I, self._I_threshold, out=self._below)
+        if self._below.any():
+            np.subtract(self._I_threshold, self._I, out=onset)
+            onset *= 0.5
+            onset *= self._below
+            self._E += onset
+            self._R += onset
+            np.copyto(self._I, self._I_threshold, where=self._below)
+
+    @property
+    def V(self) -> np.ndarray:
+        return self._V
+
+    @property
+    def SEIRV(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        return self._S, self._E, self._I, self._R, self._V
+
+    @property
+    def vaccination(self) -> np.ndarray:
+        return self._vaccination
+
+    @vaccination.setter
+    def vaccination(self, vaccination: ArrayLike) -> None:
+        self._vaccination[...] = vaccination
+
+    @property
+    def omega(self) -> np.ndarray:
+        return self._omega
+
+    @omega.setter
+    def omega(self, omega: ArrayLike) -> None:
+        self._omega[...] = omega
+
+if __name__ == "__main__":
+    pass
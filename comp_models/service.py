@@ -0,0 +1,311 @@
+# Copyright (C) 2020 BITJUNGLE Rune Mathisen
+# This code is licensed under a GPLv3 license
+# See http://www.gnu.org/licenses/gpl-3.0.html
+
+'''
+Micro-batching what-if service around the SEIR model.
+
+Concurrent scenario requests that arrive within a short window are
+collected and run together as SEIR_batch batches in a worker pool, and
+the individual trajectories are then handed back to each caller. Each
+window is split by time step and by length, in powers of two of the
+number of steps, so that short requests never wait for a long one. The service
+can be used in-process (ScenarioService.submit), over HTTP or over a
+Unix socket:
+
+    POST /simulate   JSON scenario -> JSON trajectories
+    GET  /metrics    latency and batch size statistics
+
+Start a server with: python -m comp_models.service --port 8080
+'''
+
+import argparse
+import asyncio
+import json
+import math
+from collections import deque
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+from .seir_batch import SEIR_batch
+
+Scenario = Dict[str, float]
+
+MAX_STEPS = 100000
+
+_REQUIRED = ('S_start', 'I_start', 'gamma', 'sigma', 't_max')
+_DEFAULTS = {'E_start': 0.0, 'R_start': 0.0, 'I_threshold': 0.0, 'dt': 1.0}
+_COMPARTMENTS = ('S_start', 'E_start', 'I_start', 'R_start')
+_NON_NEGATIVE = _COMPARTMENTS + ('I_threshold', 'beta', 'gamma', 'sigma')
+_REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed', 500: 'Internal Server Error'}
+
+def parse_scenario(raw: Dict[str, Any], max_steps: int = MAX_STEPS) -> Scenario:
+    '''
+    Validate a scenario and fill in defaults. Either beta or R0 must be
+    given; beta is derived as R0 * gamma when only R0 is present. All
+    values must be finite, compartments and rates non-negative with a
+    positive population, and t_max / dt may not exceed max_steps.
+    '''
+    if not isinstance(raw, dict):
+        raise ValueError("scenario must be a JSON object")
+    missing = [key for key in _REQUIRED if key not in raw]
+    if 'beta' not in raw and 'R0' not in raw:
+        missing.append('beta or R0')
+    if missing:
+        raise ValueError("scenario is missing: {}".format(', '.join(missing)))
+    scenario = dict(_DEFAULTS)
+    try:
+        for key in _REQUIRED + tuple(_DEFAULTS):
+            if key in raw:
+                scenario[key] = float(raw[key])
+        if 'beta' in raw:
+            scenario['beta'] = float(raw['beta'])
+        else:
+            scenario['beta'] = float(raw['R0']) * scenario['gamma']
+    except (TypeError, ValueError, OverflowError):
+        raise ValueError("scenario values must be numbers") from None
+    if not all(math.isfinite(value) for value in scenario.values()):
+        raise ValueError("scenario values must be finite")
+    if any(scenario[key] < 0 for key in _NON_NEGATIVE):
+        raise ValueError("{} may not be negative".format(', '.join(_NON_NEGATIVE)))
+    if sum(scenario[key] for key in _COMPARTMENTS) <= 0:
+        raise ValueError("the population S_start + E_start + I_start + R_start must be positive")
+    if scenario['dt'] <= 0 or scenario['t_max'] <= 0:
+        raise ValueError("t_max and dt must be positive")
+    if scenario['t_max'] / scenario['dt'] > max_steps:
+        raise ValueError("t_max / dt may not exceed {} steps".format(max_steps))
+    return scenario
+
+def _batch_key(scenario: Scenario) -> Tuple[float, int]:
+    '''
+    Scenarios with the same key share a batch: the same time step, and
+    numbers of steps within a factor of two of each other, so no column
+    runs more than twice the steps it needs.
+    '''
+    return scenario['dt'], math.ceil(scenario['t_max'] / scenario['dt']).bit_length()
+
+def run_batch(scenarios: List[Scenario]) -> List[Dict[str, List[float]]]:
+    '''
+    Run parsed scenarios as vectorized batches, one batch per time step
+    and length bucket (see _batch_key), and return the S, E, I and R
+    trajectories of each scenario. Module level so that it can also be
+    shipped to a process pool.
+    '''
+    results = [None] * len(scenarios)
+    groups = {}
+    for idx, scenario in enumerate(scenarios):
+        groups.setdefault(_batch_key(scenario), []).append(idx)
+    for (dt, _), members in groups.items():
+        picked = [scenarios[idx] for idx in members]
+        num_iters = [math.ceil(scenario['t_max'] / dt) for scenario in picked]
+        model = SEIR_batch(*([scenario[key] for scenario in picked]
+                             for key in ('S_start', 'E_start', 'I_start', 'R_start',
+                                         'beta', 'gamma', 'sigma', 'I_threshold')))
+        S, E, I, R = model.simulate(max(num_iters), dt)
+        for col, (idx, num_iter) in enumerate(zip(members, num_iters)):
+            results[idx] = {'S': S[:num_iter, col].tolist(),
+                            'E': E[:num_iter, col].tolist(),
+                            'I': I[:num_iter, col].tolist(),
+                            'R': R[:num_iter, col].tolist()}
+    return results
+
+def _percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q / 100 * (len(ordered) - 1))))]
+
+class ScenarioService:
+    '''
+    Collects scenario requests for up to `window` seconds (or until
+    `max_batch` requests are waiting) and runs them on `executor`, as
+    one batch per time step and length bucket; each caller is answered
+    as soon as its own batch is done. A ThreadPoolExecutor is used by default; a
+    ProcessPoolExecutor can be passed in to sidestep the GIL. Scenarios
+    longer than `max_steps` time steps are rejected.
+    '''
+    def __init__(self, window: float = 0.005, max_batch: int = 1024, executor: Optional[Executor] = None, history: int = 10000, max_steps: int = MAX_STEPS):
+        if window < 0 or max_batch < 1:
+            raise ValueError("window must be >= 0 and max_batch >= 1")
+        self._window = window
+        self._max_batch = max_batch
+        self._max_steps = max_steps
+        self._executor = executor if executor is not None else ThreadPoolExecutor()
+        self._owns_executor = executor is None
+        self._pending = []
+        self._timer = None
+        self._running = set()
+        self._latencies = deque(maxlen=history)
+        self._batch_sizes = deque(maxlen=history)
+        self._requests = 0
+        self._batches = 0
+        self._failures = 0
+
+    async def submit(self, raw: Dict[str, Any]) -> Dict[str, List[float]]:
+        '''Queue one scenario and wait for its trajectories.'''
+        scenario = parse_scenario(raw, self._max_steps)
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((scenario, future, loop.time()))
+        if len(self._pending) >= self._max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self._window, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        groups = {}
+        for item in self._pending:
+            groups.setdefault(_batch_key(item[0]), []).append(item)
+        self._pending = []
+        for batch in groups.values():
+            task = asyncio.ensure_future(self._run(batch))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+
+    async def _run(self, batch: List[Tuple[Scenario, asyncio.Future, float]]) -> None:
+        loop = asyncio.get_running_loop()
+        self._batches += 1
+        self._batch_sizes.append(len(batch))
+        try:
+            results = await loop.run_in_executor(self._executor, run_batch, [item[0] for item in batch])
+        except Exception as exc: # pylint: disable=broad-except
+            self._failures += len(batch)
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+        now = loop.time()
+        for (_, future, started), result in zip(batch, results):
+            self._requests += 1
+            self._latencies.append(now - started)
+            if not future.done():
+                future.set_result(result)
+
+    def metrics(self) -> Dict[str, float]:
+        '''Latency (milliseconds) and batch size statistics over the recent history.'''
+        latencies = [1000 * value for value in self._latencies]
+        sizes = list(self._batch_sizes)
+        return {
+            'requests': self._requests,
+            'failures': self._failures,
+            'batches': self._batches,
+            'pending': len(self._pending),
+            'window_ms': 1000 * self._window,
+            'max_batch': self._max_batch,
+            'batch_size_mean': sum(sizes) / len(sizes) if sizes else 0.0,
+            'batch_size_max': max(sizes) if sizes else 0,
+            'latency_ms_mean': sum(latencies) / len(latencies) if latencies else 0.0,
+            'latency_ms_p50': _percentile(latencies, 50),
+            'latency_ms_p95': _percentile(latencies, 95),
+            'latency_ms_p99': _percentile(latencies, 99),
+            'latency_ms_max': max(latencies) if latencies else 0.0,
+        }
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            try:
+                status, payload = await self._dispatch(reader)
+            except (ValueError, asyncio.IncompleteReadError) as exc:
+                status, payload = 400, {'error': str(exc)}
+            except Exception as exc: # pylint: disable=broad-except
+                status, payload = 500, {'error': '{}: {}'.format(type(exc).__name__, exc)}
+            try:
+                body = json.dumps(payload, allow_nan=False).encode()
+            except ValueError:
+                status, body = 500, json.dumps({'error': 'result is not finite'}).encode()
+            writer.write('HTTP/1.1 {} {}\r\nContent-Type: application/json\r\nContent-Length: {}\r\nConnection: close\r\n\r\n'
+                         .format(status, _REASONS[status], len(body)).encode() + body)
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def _dispatch(self, reader: asyncio.StreamReader) -> Tuple[int, Any]:
+        request_line = (await reader.readline()).decode('latin-1').split()
+        if len(request_line) < 2:
+            raise ValueError("malformed request line")
+        method, path = request_line[0], request_line[1]
+        length = 0
+        while True:
+            line = (await reader.readline()).decode('latin-1').strip()
+            if not line:
+                break
+            name, _, value = line.partition(':')
+            if name.strip().lower() == 'content-length':
+                length = int(value)
+        body = await reader.readexactly(length) if length else b''
+        if path == '/metrics':
+            return (200, self.metrics()) if method == 'GET' else (405, {'error': 'use GET'})
+        if path == '/simulate':
+            if method != 'POST':
+                return 405, {'error': 'use POST'}
+            try:
+                raw = json.loads(body)
+            except json.JSONDecodeError as exc:
+                raise ValueError("invalid JSON: {}".format(exc)) from None
+            return 200, await self.submit(raw)
+        return 404, {'error': 'unknown path {}'.format(path)}
+
+    async def serve_http(self, host: str = '127.0.0.1', port: int = 8080) -> asyncio.AbstractServer:
+        '''Start serving HTTP on host:port (port 0 picks a free port).'''
+        return await asyncio.start_server(self._handle, host, port)
+
+    async def serve_unix(self, path: str) -> asyncio.AbstractServer:
+        '''Start serving HTTP over the Unix socket at path.'''
+        return await asyncio.start_unix_server(self._handle, path)
+
+    async def close(self) -> None:
+        '''Run whatever is still pending and release the worker pool.'''
+        self._flush()
+        if self._running:
+            await asyncio.gather(*self._running, return_exceptions=True)
+        if self._owns_executor:
+            self._executor.shutdown(wait=False)
+
+async def http_request(method: str, path: str, payload: Any = None, host: str = '127.0.0.1', port: Optional[int] = None, unix_path: Optional[str] = None) -> Tuple[int, Any]:
+    '''
+    Minimal client for the service: send one request over TCP (host/port)
+    or a Unix socket (unix_path) and return the status and decoded JSON.
+    '''
+    if unix_path is not None:
+        reader, writer = await asyncio.open_unix_connection(unix_path)
+    else:
+        reader, writer = await asyncio.open_connection(host, port)
+    body = b'' if payload is None else json.dumps(payload).encode()
+    writer.write('{} {} HTTP/1.1\r\nHost: {}\r\nContent-Type: application/json\r\nContent-Length: {}\r\n\r\n'
+                 .format(method, path, host, len(body)).encode() + body)
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    head, _, content = response.partition(b'\r\n\r\n')
+    status = int(head.split(b' ', 2)[1])
+    return status, json.loads(content)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Micro-batching SEIR what-if service")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--unix', help="serve on this Unix socket path instead of TCP")
+    parser.add_argument('--window', type=float, default=0.005, help="batching window in seconds")
+    parser.add_argument('--max-batch', type=int, default=1024)
+    parser.add_argument('--max-steps', type=int, default=MAX_STEPS, help="longest scenario accepted, in time steps")
+    args = parser.parse_args()
+
+    async def serve() -> None:
+        service = ScenarioService(args.window, args.max_batch, max_steps=args.max_steps)
+        if args.unix:
+            server = await service.serve_unix(args.unix)
+        else:
+            server = await service.serve_http(args.host, args.port)
+        async with server:
+            await server.serve_forever()
+
+    asyncio.run(serve())
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+# Copyright (C) 2020 BITJUNGLE Rune Mathisen
+# This code is licensed under a GPLv3 license
+# See http://www.gnu.org/licenses/gpl-3.0.html
+
+from typing import Tuple
+import numpy as np
+from .seir_batch import ArrayLike, _Batch
+
+class SIR_batch(_Batch):
+    '''
+    Vectorized SIR model advancing many independent scenarios at once.
+
+    The batch counterpart of SIR_model, laid out like SEIR_batch: the
+    state is one contiguous (3, size) block in float64 or float32, and
+    update() works in place. S, I and R are views into that block, and
+    beta and gamma can follow daily schedules (see set_schedule).
+    '''
+    _RATE_ROWS = {'beta': 0, 'gamma': 1}
+
+    def __init__(self, S_start: ArrayLike, I_start: ArrayLike, R_start: ArrayLike, beta: ArrayLike, gamma: ArrayLike, I_threshold: ArrayLike = 0.0, dtype: type = np.float64):
+        self._allocate((S_start, I_start, R_start), (beta, gamma, I_threshold), dtype)
+        self._S, self._I, self._R = self._state
+        self._beta, self._gamma, self._I_threshold = self._params
+
+    def update(self, dt: float) -> None:
+        # Same sequential Euler scheme as SIR_model
+        self._apply_schedules()
+        contact, flow, outflow = self._scratch
+        np.multiply(self._beta, self._I, out=contact)
+        contact /= self._N
+        contact *= dt
+        np.multiply(contact, self._S, out=flow)
+        self._S -= flow
+        np.multiply(contact, self._S, out=flow)
+        np.multiply(self._gamma, self._I, out=outflow)
+        outflow *= dt
+        self._I += flow
+        self._I -= outflow
+        np.multiply(self._gamma, self._I, out=flow)
+        flow *= dt
+        self._R += flow
+        self._time += dt
+        np.less(self._I, self._I_threshold, out=self._below)
+        if self._below.any():
+            np.subtract(self._I_threshold, self._I, out=flow)
+            flow *= 0.5
+            flow *= self._below
+            self._S += flow
+            self._R += flow
+            np.copyto(self._I, self._I_threshold, where=self._below)
+
+    @property
+    def S(self) -> np.ndarray:
+        return self._S
+
+    @property
+    def I(self) -> np.ndarray:
+        return self._I
+
+    @property
+    def R(self) -> np.ndarray:
+        return self._R
+
+    @property
+    def SIR(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        return self._S, self._I, self._R
+
+    @property
+    def R0(self) -> np.ndarray:
+        return self._beta / self._gamma
+
+    @property
+    def beta(self) -> np.ndarray:
+        return self._beta
+
+    @beta.setter
+    def beta(self, beta: ArrayLike) -> None:
+        self._beta[...] = beta
+
+    @property
+    def gamma(self) -> np.ndarray:
+        return self._gamma
+
+    @gamma.setter
+    def gamma(self, gamma: ArrayLike) -> None:
+        self._gamma[...] = gamma
+
+if __name__ == "__main__":
+    pass
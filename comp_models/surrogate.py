@@ -0,0 +1,224 @@
+# Copyright (C) 2020 BITJUNGLE Rune Mathisen
+# This code is licensed under a GPLv3 license
+# See http://www.gnu.org/licenses/gpl-3.0.html
+
+'''
+Precomputed surrogate for instant SEIR scenario queries.
+
+SEIR_surrogate runs SEIR_batch once over a dense (R0, gamma, sigma) grid
+for a fixed population, start state and horizon, and stores the summary
+outputs peak_I, peak_day and final_size. Queries are answered by
+multilinear interpolation on that grid, together with an error estimate,
+and fall back to a real simulation outside the grid or when the error
+estimate exceeds the requested tolerance.
+
+The error estimate of a grid cell is the larger of the interpolation
+error measured at its centre when the grid is built, and the standard
+multilinear bound h**2 / 8 * |f''| summed over the parameters, with f''
+taken from second differences on the grid. It is an estimate, not a
+strict bound: cells where an output jumps (e.g. peak_day around R0 = 1)
+can still err more. Multilinear interpolation is used rather than
+splines, to keep queries cheap and free of overshoot. The grid is saved
+as .npy files plus a small JSON file, and can be loaded memory-mapped.
+'''
+
+import json
+import math
+import os
+from typing import Dict, Optional, Sequence, Tuple
+import numpy as np
+
+from .seir_batch import SEIR_batch
+
+PARAMETERS = ('R0', 'gamma', 'sigma')
+OUTPUTS = ('peak_I', 'peak_day', 'final_size')
+
+def summarise(R0: np.ndarray, gamma: np.ndarray, sigma: np.ndarray, scenario: Dict[str, float], chunk: int = 65536, dtype: type = np.float64) -> np.ndarray:
+    '''
+    Simulate the scenario for each (R0, gamma, sigma) and return an array
+    of shape (len(R0), 3) with peak_I, peak_day and final_size (N - S at
+    t_max). The runs are done as SEIR_batch batches of at most chunk
+    members, and only the summaries are kept, not the trajectories.
+    '''
+    R0, gamma, sigma = np.broadcast_arrays(*(np.atleast_1d(np.asarray(v, dtype=np.float64)) for v in (R0, gamma, sigma)))
+    num_iter = math.ceil(scenario['t_max'] / scenario['dt'])
+    out = np.empty((R0.shape[0], len(OUTPUTS)))
+    for start in range(0, R0.shape[0], chunk):
+        part = slice(start, start + chunk)
+        model = SEIR_batch(scenario['S_start'], scenario['E_start'], scenario['I_start'], scenario['R_start'],
+                           R0[part] * gamma[part], gamma[part], sigma[part], scenario['I_threshold'], dtype=dtype)
+        peak = model.I.astype(np.float64)
+        peak_step = np.zeros(model.size)
+        higher = np.empty(model.size, dtype=bool)
+        for step in range(1, num_iter):
+            model.update(scenario['dt'])
+            np.greater(model.I, peak, out=higher)
+            np.copyto(peak, model.I, where=higher)
+            peak_step[higher] = step
+        out[part, 0] = peak
+        out[part, 1] = peak_step * scenario['dt']
+        out[part, 2] = model.N - model.S
+    return out
+
+def _curvature_bound(axes: Sequence[np.ndarray], values: np.ndarray) -> np.ndarray:
+    '''
+    Per cell error bound of multilinear interpolation: the sum over the
+    parameters of h**2 / 8 * max|f''| on the cell corners, with f''
+    estimated by second divided differences on the grid.
+    '''
+    bound = np.zeros(tuple(axis.shape[0] - 1 for axis in axes) + values.shape[-1:])
+    for dim, axis in enumerate(axes):
+        f = np.moveaxis(values, dim, 0)
+        h = np.diff(axis).reshape((-1,) + (1,) * (f.ndim - 1))
+        slope = np.diff(f, axis=0) / h
+        second = np.zeros_like(f)
+        if f.shape[0] > 2:
+            second[1:-1] = 2 * np.diff(slope, axis=0) / (h[1:] + h[:-1])
+            second[0], second[-1] = second[1], second[-2]
+        cell = np.moveaxis(np.maximum(np.abs(second[1:]), np.abs(second[:-1])) * h ** 2 / 8, 0, dim)
+        for other, other_axis in enumerate(axes):
+            if other != dim:
+                n = other_axis.shape[0]
+                cell = np.maximum(np.take(cell, np.arange(n - 1), axis=other), np.take(cell, np.arange(1, n), axis=other))
+        bound += cell
+    return bound
+
+class SEIR_surrogate:
+    '''
+    Interpolating surrogate of SEIR_model summary outputs over an
+    (R0, gamma, sigma) grid. Build one with SEIR_surrogate.build() or
+    load a saved one with SEIR_surrogate.load().
+    '''
+    def __init__(self, axes: Sequence[np.ndarray], values: np.ndarray, errors: np.ndarray, scenario: Dict[str, float]):
+        self._axes = tuple(np.asarray(axis, dtype=np.float64) for axis in axes)
+        shape = tuple(axis.shape[0] for axis in self._axes)
+        if len(self._axes) != len(PARAMETERS) or min(shape) < 2:
+            raise ValueError("need at least two grid points for each of {}".format(', '.join(PARAMETERS)))
+        if any(np.any(np.diff(axis) <= 0) for axis in self._axes):
+            raise ValueError("grid axes must be strictly increasing")
+        if values.shape != shape + (len(OUTPUTS),) or errors.shape != tuple(n - 1 for n in shape) + (len(OUTPUTS),):
+            raise ValueError("values and errors do not match the grid axes")
+        self._values = values
+        self._errors = errors
+        self._scenario = dict(scenario)
+        self._resolution = np.array([scenario['dt'] if name == 'peak_day' else 0.0 for name in OUTPUTS])
+
+    @classmethod
+    def build(cls, R0: Sequence[float], gamma: Sequence[float], sigma: Sequence[float], S_start: float, E_start: float, I_start: float, R_start: float = 0.0, t_max: float = 180, dt: float = 1, I_threshold: float = 0.0, chunk: int = 65536, storage: type = np.float32) -> 'SEIR_surrogate':
+        '''
+        Simulate every grid point, and every cell centre for the error
+        estimates, in batches. Results are stored in `storage` precision;
+        float32 is plenty next to the interpolation error and halves the
+        size of the grid.
+        '''
+        scenario = {'S_start': S_start, 'E_start': E_start, 'I_start': I_start, 'R_start': R_start,
+                    't_max': t_max, 'dt': dt, 'I_threshold': I_threshold}
+        axes = tuple(np.asarray(axis, dtype=np.float64) for axis in (R0, gamma, sigma))
+        grid = np.meshgrid(*axes, indexing='ij')
+        shape = grid[0].shape
+        values = summarise(*(g.ravel() for g in grid), scenario, chunk).reshape(shape + (len(OUTPUTS),))
+        surrogate = cls(axes, values.astype(storage), np.zeros(tuple(n - 1 for n in shape) + (len(OUTPUTS),), dtype=storage), scenario)
+        centres = np.meshgrid(*((axis[1:] + axis[:-1]) / 2 for axis in axes), indexing='ij')
+        points = np.stack([c.ravel() for c in centres], axis=1)
+        exact = summarise(points[:, 0], points[:, 1], points[:, 2], scenario, chunk)
+        interpolated, _, _ = surrogate.interpolate(points)
+        measured = np.abs(interpolated - exact).reshape(surrogate._errors.shape)
+        bound = np.maximum(measured, _curvature_bound(axes, values))
+        # The model itself only resolves the peak day to the time step
+        bound[..., OUTPUTS.index('peak_day')] += dt / 2
+        surrogate._errors[...] = bound
+        return surrogate
+
+    def save(self, path: str) -> None:
+        '''Save the surrogate to the directory path.'''
+        os.makedirs(path, exist_ok=True)
+        np.save(os.path.join(path, 'values.npy'), self._values)
+        np.save(os.path.join(path, 'errors.npy'), self._errors)
+        with open(os.path.join(path, 'surrogate.json'), mode='w') as fh:
+            json.dump({'axes': dict(zip(PARAMETERS, (axis.tolist() for axis in self._axes))),
+                       'outputs': OUTPUTS, 'scenario': self._scenario}, fh)
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> 'SEIR_surrogate':
+        '''Load a surrogate saved with save(), memory-mapped by default.'''
+        with open(os.path.join(path, 'surrogate.json'), mode='r') as fh:
+            meta = json.load(fh)
+        if tuple(meta['outputs']) != OUTPUTS:
+            raise ValueError("{} holds other outputs than {}".format(path, ', '.join(OUTPUTS)))
+        mmap_mode = 'r' if mmap else None
+        return cls([meta['axes'][name] for name in PARAMETERS],
+                   np.load(os.path.join(path, 'values.npy'), mmap_mode=mmap_mode),
+                   np.load(os.path.join(path, 'errors.npy'), mmap_mode=mmap_mode),
+                   meta['scenario'])
+
+    def interpolate(self, points: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        '''
+        Multilinear interpolation at points of shape (m, 3) holding
+        (R0, gamma, sigma). Returns the interpolated outputs and their
+        error estimates, both (m, 3), and a mask of the points inside the
+        grid. Points outside are clamped to the grid edge.
+        '''
+        points = np.atleast_2d(np.asarray(points, dtype=np.float64))
+        cells = []
+        fractions = []
+        inside = np.ones(points.shape[0], dtype=bool)
+        for dim, axis in enumerate(self._axes):
+            value = points[:, dim]
+            inside &= (value >= axis[0]) & (value <= axis[-1])
+            cell = np.clip(np.searchsorted(axis, value, side='right') - 1, 0, axis.shape[0] - 2)
+            cells.append(cell)
+            fractions.append(np.clip((value - axis[cell]) / (axis[cell + 1] - axis[cell]), 0.0, 1.0))
+        result = np.zeros((points.shape[0], len(OUTPUTS)))
+        for corner in range(8):
+            offsets = [(corner >> dim) & 1 for dim in range(3)]
+            weight = np.ones(points.shape[0])
+            for fraction, offset in zip(fractions, offsets):
+                weight *= fraction if offset else 1.0 - fraction
+            result += weight[:, np.newaxis] * self._values[cells[0] + offsets[0], cells[1] + offsets[1], cells[2] + offsets[2]]
+        return result, np.asarray(self._errors[cells[0], cells[1], cells[2]], dtype=np.float64), inside
+
+    def simulate(self, R0: float, gamma: float, sigma: float) -> Dict[str, float]:
+        '''The exact summary outputs from running the model.'''
+        return dict(zip(OUTPUTS, summarise(R0, gamma, sigma, self._scenario)[0].tolist()))
+
+    def query(self, R0: float, gamma: float, sigma: float, rtol: Optional[float] = 0.01) -> Dict[str, object]:
+        '''
+        peak_I, peak_day and final_size for one parameter set. The grid
+        answer is used when the point is inside the grid and every error
+        estimate is within rtol of its value (rtol=None accepts any
+        error); otherwise the model is simulated. The result also holds
+        'error_estimate', the per output error estimates (not guaranteed
+        bounds, see the module docstring), and 'source', 'grid' or
+        'simulation'. As the model resolves peak_day only to the time
+        step, peak_day errors within dt are accepted on top of rtol.
+        '''
+        values, errors, inside = self.interpolate([[R0, gamma, sigma]])
+        values, errors = values[0], errors[0]
+        if inside[0] and (rtol is None or np.all(errors <= rtol * np.abs(values) + self._resolution)):
+            result = dict(zip(OUTPUTS, values.tolist()))
+            result['error_estimate'] = dict(zip(OUTPUTS, errors.tolist()))
+            result['source'] = 'grid'
+            return result
+        result = self.simulate(R0, gamma, sigma)
+        result['error_estimate'] = dict.fromkeys(OUTPUTS, 0.0)
+        result['source'] = 'simulation'
+        return result
+
+    @property
+    def axes(self) -> Dict[str, np.ndarray]:
+        return dict(zip(PARAMETERS, self._axes))
+
+    @property
+    def values(self) -> np.ndarray:
+        return self._values
+
+    @property
+    def errors(self) -> np.ndarray:
+        return self._errors
+
+    @property
+    def scenario(self) -> Dict[str, float]:
+        return dict(self._scenario)
+
+if __name__ == "__main__":
+    pass
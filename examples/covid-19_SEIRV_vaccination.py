@@ -0,0 +1,45 @@
+# Copyright (C) 2020 BITJUNGLE Rune Mathisen
+# This code is licensed under a GPLv3 license
+# See http://www.gnu.org/licenses/gpl-3.0.html
+
+import numpy as np
+import matplotlib.pyplot as plt
+from comp_models import SEIRV_batch
+
+# Constants and start parameters ---------------------------------------
+# Same community as covid-19_SEIR_variable_R0.py, now with vaccination
+# and waning immunity. Every column of the batch is one rollout strategy.
+N = 55000       # Total population
+I_start = 20    # Number of infectious at simulation start
+E_start = I_start # Number of exposed at simulation start
+R0 = 2.5        # basic reproduction number
+gamma = 1 / 10  # 1 / duration of infectiousness
+sigma = 1/2.5   # inverse of the mean latent period
+omega = 1 / 180 # 1 / duration of immunity after recovery
+beta = R0 * gamma
+
+# Rollout strategies: start day x daily capacity -----------------------
+t_max = 365     # number of days to simulate
+start_days = np.arange(0, 181, 5)
+capacities = np.arange(0, 1001, 25)
+start_grid, capacity_grid = np.meshgrid(start_days, capacities, indexing='ij')
+strategies = start_grid.size
+
+schedule = np.zeros((t_max, strategies))
+for k, (start, capacity) in enumerate(zip(start_grid.ravel(), capacity_grid.ravel())):
+    schedule[start:, k] = capacity
+
+# Simulation -----------------------------------------------------------
+model = SEIRV_batch(N - E_start - I_start, E_start, I_start, 0, 0, beta, gamma, sigma,
+                    vaccination=np.zeros(strategies), omega=omega)
+model.set_schedule('vaccination', schedule)
+S, E, I, R, V = model.simulate(t_max, 1)
+print("Simulated {} rollout strategies".format(strategies))
+
+peak = I.max(axis=0).reshape(start_grid.shape)
+plt.title("Peak infectious (SEIRV model), $N={:5.0f}$, $R_0={:4.2f}$".format(N, R0))
+plt.pcolormesh(capacities, start_days, peak, shading='auto')
+plt.colorbar(label='Max infectious at the same time')
+plt.xlabel('Vaccination capacity (doses per day)')
+plt.ylabel('Start of vaccination (day)')
+plt.show()
@@ -6,6 +6,7 @@ import math
 import numpy as np 
 import matplotlib.pyplot as plt
 import comp_models.seir_model as seir
+from comp_models.plotting import annotate_breakpoints, plot_series
 from datetime import date
 
 # Useful resources -----------------------------------------------------
@@ -118,14 +119,10 @@ plt_x_label = {'en': 'Days', 'no': 'Dager'}
 plt_y_label = {'en': 'Number of people', 'no': 'Antall mennesker'}
 
 plt.title(plt_title[lang])
-plt.plot(S, label=S_txt[lang])
-plt.plot(E, label=E_txt[lang])
-plt.plot(I, label=I_txt[lang])
-plt.plot(R, label=R_txt[lang])
+plot_series({S_txt[lang]: S, E_txt[lang]: E, I_txt[lang]: I, R_txt[lang]: R}, dt=dt)
 plt.scatter(I_max_idx, I_max, marker='x')
 plt.text(I_max_idx, I_max+1000, I_max_txt[lang])
-for key, val in Rvals.items():
-    plt.axvline(key, color='silver', linestyle='--')
+annotate_breakpoints(Rvals)
 plt.grid()
 plt.xlabel(plt_x_label[lang])
 plt.ylabel(plt_y_label[lang])
@@ -19,7 +19,14 @@ setup(
         'Operating System :: OS Independent'
     ],
     packages=find_packages(include=['comp_models', 'comp_models.*']),
-    install_requires=[],
+    entry_points={
+        'console_scripts': [
+            'comp_models=comp_models.cli:main'
+        ]
+    },
+    install_requires=[
+        'numpy'
+    ],
     extras_require={
         'dev': [
             'matplotlib',
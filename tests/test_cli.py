@@ -0,0 +1,119 @@
+import csv
+import importlib.util
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from comp_models import SEIR_model
+from comp_models.cli import load_scenarios, main
+
+class TestCommandLine(unittest.TestCase):
+    '''Unit tests for the command-line batch runner'''
+
+    def setUp(self):
+        '''Method called to prepare the test fixture'''
+        self.tmp = tempfile.TemporaryDirectory()
+        self.scenarios = {
+            'defaults': {'N': 3700, 'I_start': 1, 'E_start': 10, 'gamma': 1/14, 'sigma': 1/3, 't_max': 90},
+            'scenarios': [
+                {'name': 'baseline', 'R0': 4.9},
+                {'name': 'intervention', 'R0': 4.9, 'R0_schedule': {'10': 1.5, '30': 0.8}},
+                {'name': 'sir', 'model': 'SIR', 'R0': 5.2, 'dt': 0.5, 't_max': 60},
+            ]
+        }
+        self.path = self.write_json('cruise.json', self.scenarios)
+
+    def tearDown(self):
+        '''Method called immediately after the test method has been called'''
+        self.tmp.cleanup()
+
+    def write_json(self, name: str, content: object) -> str:
+        path = os.path.join(self.tmp.name, name)
+        with open(path, mode='w') as fh:
+            json.dump(content, fh)
+        return path
+
+    def read_csv(self, name: str) -> list:
+        with open(os.path.join(self.tmp.name, 'out', name), newline='') as fh:
+            return list(csv.DictReader(fh))
+
+    def test_load_scenarios_applies_defaults(self) -> None:
+        baseline, intervention, sir = load_scenarios(self.path)
+        self.assertEqual(baseline['S_start'], 3700 - 11)
+        self.assertAlmostEqual(baseline['R0'], 4.9)
+        self.assertEqual(intervention['R0_schedule'], {10.0: 1.5, 30.0: 0.8})
+        self.assertEqual(sir['num_iter'], 120)
+        self.assertNotIn('E_start', sir)
+
+    def test_rejects_invalid_scenarios(self) -> None:
+        path = self.write_json('bad.json', {'N': 100, 'I_start': 1, 'gamma': 0.1, 't_max': 10})
+        with self.assertRaises(ValueError):
+            load_scenarios(path)
+        self.assertEqual(main([path, '-q', '-o', self.tmp.name]), 2)
+
+    def test_writes_trajectories_matching_the_models(self) -> None:
+        out = os.path.join(self.tmp.name, 'out')
+        self.assertEqual(main([self.path, '-q', '-o', out]), 0)
+        summary = {row['name']: row for row in self.read_csv('summary.csv')}
+        self.assertEqual(set(summary), {'baseline', 'intervention', 'sir'})
+        rows = self.read_csv('intervention.csv')
+        self.assertEqual(len(rows), 90)
+        self.assertEqual(len(self.read_csv('sir.csv')), 120)
+
+        # Same procedure as examples/covid-19_SEIR_variable_R0.py, except
+        # that R0 changes with the update starting on the scheduled day
+        gamma = 1/14
+        model = SEIR_model(3689, 10, 1, 0, 4.9 * gamma, gamma, 1/3)
+        Rvals = {11: 1.5, 31: 0.8}
+        for i in range(1, 90):
+            if i in Rvals:
+                model.beta = Rvals[i] * gamma
+            model.update(1)
+            self.assertAlmostEqual(float(rows[i]['I']), model.I, places=6)
+        self.assertAlmostEqual(float(summary['intervention']['final_S']), model.S, places=6)
+
+    def test_rejects_unsafe_names(self) -> None:
+        for name in ('summary', 'SUMMARY', '../escape', 'a/b', '..', ''):
+            path = self.write_json('named.json', dict(self.scenarios, scenarios=[{'name': name, 'R0': 2}]))
+            with self.assertRaises(ValueError, msg=name):
+                load_scenarios(path)
+            self.assertEqual(main([path, '-q', '-o', os.path.join(self.tmp.name, 'out')]), 2)
+        self.assertFalse(os.path.exists(os.path.join(self.tmp.name, 'escape.csv')))
+
+    def test_invalid_numbers_exit_with_code_2(self) -> None:
+        defaults = self.scenarios['defaults']
+        for bad in ({'beta': 0.3, 'gamma': 0}, {'R0': 2, 't_max': 1e400}, {'R0': float('nan')},
+                    {'R0': 2, 'R0_schedule': {'10': float('inf')}}, {'R0': 2, 'R0_schedule': {'10.5': 1}}):
+            path = self.write_json('bad.json', dict(defaults, **bad))
+            self.assertEqual(main([path, '-q', '-o', self.tmp.name]), 2, bad)
+        path = self.write_json('bad.json', {'defaults': [1, 2], 'scenarios': [{'R0': 2}]})
+        self.assertEqual(main([path, '-q', '-o', self.tmp.name]), 2)
+
+    def test_unwritable_output_exits_with_code_2(self) -> None:
+        blocker = os.path.join(self.tmp.name, 'not_a_directory')
+        with open(blocker, mode='w') as fh:
+            fh.write('')
+        self.assertEqual(main([self.path, '-q', '-o', blocker]), 2)
+        self.assertEqual(main([self.path, '-q', '-o', os.path.join(blocker, 'sub')]), 2)
+
+    def test_rejects_duplicate_names(self) -> None:
+        other = self.write_json('other.json', {'name': 'baseline', 'N': 100, 'I_start': 1, 'R0': 2, 'gamma': 0.1, 'sigma': 0.2, 't_max': 10})
+        self.assertEqual(main([self.path, other, '-q', '-o', self.tmp.name]), 2)
+
+    @unittest.skipUnless(importlib.util.find_spec('matplotlib'), "matplotlib not installed")
+    def test_plot_writes_images(self) -> None:
+        out = os.path.join(self.tmp.name, 'out')
+        self.assertEqual(main([self.path, '-q', '-o', out, '--plot']), 0)
+        self.assertTrue(os.path.isfile(os.path.join(out, 'intervention.png')))
+
+    def test_heavy_libraries_are_imported_lazily(self) -> None:
+        code = "import sys, comp_models.cli; print(sorted(m for m in ('numpy', 'matplotlib', 'pandas') if m in sys.modules))"
+        output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True,
+                                cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        self.assertEqual(output.stdout.strip(), '[]')
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+import importlib.util
+import time
+import unittest
+import numpy as np
+from comp_models.plotting import annotate_breakpoints, downsample, lttb, plot_fan, plot_series
+
+HAS_MATPLOTLIB = importlib.util.find_spec('matplotlib') is not None
+
+class TestLTTB(unittest.TestCase):
+    '''Unit tests for the largest-triangle-three-buckets downsampling'''
+
+    def setUp(self):
+        '''Method called to prepare the test fixture'''
+        self.x = np.arange(10000, dtype=float)
+        self.y = np.sin(self.x / 500)
+
+    def test_keeps_endpoints_and_size(self) -> None:
+        idx = lttb(self.x, self.y, 100)
+        self.assertEqual(len(idx), 100)
+        self.assertEqual(idx[0], 0)
+        self.assertEqual(idx[-1], len(self.x) - 1)
+        self.assertTrue(np.all(np.diff(idx) > 0), "Indices are not increasing")
+
+    def test_keeps_spikes(self) -> None:
+        self.y[4321] = 50
+        x, y = downsample(self.x, self.y, 50)
+        self.assertIn(4321, x)
+        self.assertEqual(y.max(), 50)
+
+    def test_short_series_are_returned_unchanged(self) -> None:
+        np.testing.assert_array_equal(lttb(self.x[:20], self.y[:20], 100), np.arange(20))
+        self.assertEqual(len(np.unique(lttb(self.x[:21], self.y[:21], 20))), 20)
+
+    def test_rejects_invalid_input(self) -> None:
+        with self.assertRaises(ValueError):
+            lttb(self.x, self.y[:10], 5)
+        with self.assertRaises(ValueError):
+            lttb(self.x, self.y, 2)
+
+
+@unittest.skipUnless(HAS_MATPLOTLIB, "matplotlib not installed")
+class TestPlotting(unittest.TestCase):
+    '''Unit tests for the plotting helpers'''
+
+    def setUp(self):
+        '''Method called to prepare the test fixture'''
+        import matplotlib
+        matplotlib.use('Agg')
+        import matplotlib.pyplot as plt
+        self.plt = plt
+        self.fig, self.ax = plt.subplots()
+
+    def tearDown(self):
+        '''Method called immediately after the test method has been called'''
+        self.plt.close(self.fig)
+
+    def test_plot_series_is_bounded(self) -> None:
+        S = np.linspace(1000, 0, 200000)
+        I = np.exp(-((np.arange(200000) - 80000) / 20000.0) ** 2)
+        plot_series({'Susceptible': S, 'Infectious': I}, dt=0.001, max_points=500, ax=self.ax)
+        lines = self.ax.get_lines()
+        self.assertEqual([line.get_label() for line in lines], ['Susceptible', 'Infectious'])
+        for line in lines:
+            self.assertEqual(len(line.get_xdata()), 500)
+            self.assertAlmostEqual(line.get_xdata()[-1], 199.999)
+
+    def test_plot_fan_from_ensemble(self) -> None:
+        rng = np.random.default_rng(0)
+        ensemble = np.cumsum(rng.normal(size=(50000, 200)), axis=0)
+        start = time.perf_counter()
+        plot_fan(ensemble, max_points=300, label='I', ax=self.ax)
+        self.fig.canvas.draw()
+        self.assertLess(time.perf_counter() - start, 10)
+        median, = self.ax.get_lines()
+        self.assertEqual(len(median.get_xdata()), 300)
+        self.assertEqual(len(self.ax.collections), 2)
+        with self.assertRaises(ValueError):
+            plot_fan(ensemble[:, 0], ax=self.ax)
+
+    def test_annotate_breakpoints(self) -> None:
+        Rvals = {0: 3.03, 27: 0.72, 63: 0.51}
+        annotate_breakpoints(Rvals, label_format='$R_0$={:.2f}', ax=self.ax)
+        self.assertEqual(len(self.ax.collections), 1)
+        self.assertEqual(len(self.ax.collections[0].get_segments()), 3)
+        self.assertEqual([text.get_text() for text in self.ax.texts], ['$R_0$=3.03', '$R_0$=0.72', '$R_0$=0.51'])
+        annotate_breakpoints([], ax=self.ax)
+        self.assertEqual(len(self.ax.collections), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,22 @@
+import unittest
+from comp_models.precision import REFERENCE_SCENARIOS, precision_drift
+
+class TestPrecisionDrift(unittest.TestCase):
+    '''Unit tests for the float32 drift report'''
+
+    def test_report_covers_reference_scenarios(self) -> None:
+        report = precision_drift(members=16)
+        self.assertEqual(set(report), set(REFERENCE_SCENARIOS))
+        for row in report.values():
+            self.assertGreaterEqual(row['max_abs_error'], 0)
+            self.assertLess(row['max_rel_error'], 1e-4)
+            self.assertTrue(row['safe'])
+            self.assertEqual(row['bytes_per_member_float64'], 2 * row['bytes_per_member_float32'])
+
+    def test_tolerance_decides_safety(self) -> None:
+        report = precision_drift(members=4, tolerance=0.0)
+        self.assertFalse(any(row['safe'] for row in report.values()))
+
+
+if __name__ == "__main__":
+    unittest.main()
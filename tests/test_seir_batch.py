@@ -0,0 +1,110 @@
+import unittest
+import numpy as np
+from comp_models import SEIR_batch, SEIR_model
+
+class TestSEIRBatch(unittest.TestCase):
+    '''Unit tests for the vectorized SEIR model class'''
+
+    def setUp(self):
+        '''Method called to prepare the test fixture'''
+        self.S_0 = np.array([90, 950, 9900])
+        self.E_0 = np.array([5, 25, 50])
+        self.I_0 = np.array([5, 25, 50])
+        self.R_0 = 0
+        self.beta = np.array([1/3, 0.5, 0.25])
+        self.gamma = 1/10
+        self.sigma = np.array([1/2.5, 1/3, 1/5])
+        self.I_threshold = np.array([0, 2, 10])
+        self.dt = 1
+
+        self.model = SEIR_batch(self.S_0, self.E_0, self.I_0, self.R_0, self.beta, self.gamma, self.sigma, self.I_threshold)
+
+    def test_can_construct(self) -> None:
+        self.assertEqual(self.model.size, 3, "Batch size not broadcast correctly")
+        np.testing.assert_array_equal(self.model.S, self.S_0)
+        np.testing.assert_array_equal(self.model.R, np.zeros(3))
+        np.testing.assert_array_equal(self.model.gamma, np.full(3, self.gamma))
+        np.testing.assert_array_equal(self.model.N, self.S_0 + self.E_0 + self.I_0)
+
+    def test_columns_match_scalar_model(self) -> None:
+        S, E, I, R = self.model.simulate(200, self.dt)
+        for k in range(3):
+            model = SEIR_model(self.S_0[k], self.E_0[k], self.I_0[k], self.R_0, self.beta[k], self.gamma, self.sigma[k], self.I_threshold[k])
+            for i in range(1, 200):
+                model.update(self.dt)
+                self.assertAlmostEqual(S[i, k], model.S, places=9)
+                self.assertAlmostEqual(E[i, k], model.E, places=9)
+                self.assertAlmostEqual(I[i, k], model.I, places=9)
+                self.assertAlmostEqual(R[i, k], model.R, places=9)
+
+    def test_simulate_shape_and_start_row(self) -> None:
+        S, _, I, _ = self.model.simulate(50, self.dt)
+        self.assertEqual(S.shape, (50, 3))
+        np.testing.assert_array_equal(I[0], self.I_0)
+        self.assertEqual(self.model.time, 49 * self.dt)
+
+    def test_beta_setter_broadcasts(self) -> None:
+        self.model.beta = 0.2
+        np.testing.assert_array_equal(self.model.beta, np.full(3, 0.2))
+        np.testing.assert_allclose(self.model.R0, np.full(3, 2.0))
+
+    def test_state_is_updated_in_place(self) -> None:
+        state = self.model.state
+        S = self.model.S
+        self.model.update(self.dt)
+        self.assertIs(self.model.state, state)
+        self.assertTrue(np.shares_memory(self.model.S, state))
+        np.testing.assert_array_equal(S, state[0])
+        self.assertTrue(state.flags['C_CONTIGUOUS'])
+
+    def test_float32_stays_close_to_float64(self) -> None:
+        model32 = SEIR_batch(self.S_0, self.E_0, self.I_0, self.R_0, self.beta, self.gamma, self.sigma, self.I_threshold, dtype=np.float32)
+        _, _, I32, R32 = model32.simulate(200, self.dt)
+        _, _, I64, R64 = self.model.simulate(200, self.dt)
+        self.assertEqual(I32.dtype, np.float32)
+        self.assertEqual(model32.state.nbytes * 2, self.model.state.nbytes)
+        np.testing.assert_allclose(I32, I64, rtol=1e-4, atol=1e-3)
+        np.testing.assert_allclose(R32, R64, rtol=1e-4, atol=1e-3)
+
+    def test_schedule_matches_setting_beta_in_a_loop(self) -> None:
+        R0 = np.array([3.0, 3.0, 0.8, 0.8, 0.8, 1.2])
+        reference = SEIR_batch(self.S_0, self.E_0, self.I_0, self.R_0, self.beta, self.gamma, self.sigma, self.I_threshold)
+        for day in range(60):
+            reference.beta = R0[min(day, len(R0) - 1)] * self.gamma
+            reference.update(self.dt)
+        self.model.set_schedule('beta', R0 * self.gamma)
+        self.model.simulate(61, self.dt)
+        np.testing.assert_array_equal(self.model.state, reference.state)
+
+    def test_schedule_per_column_with_fractional_steps(self) -> None:
+        schedule = np.array([[0.3, 0.4, 0.5], [0.1, 0.2, 0.3]])
+        self.model.set_schedule('beta', schedule)
+        for _ in range(10):
+            self.model.update(0.1)
+        np.testing.assert_array_equal(self.model.beta, schedule[0].astype(self.model.dtype))
+        self.model.update(0.1)
+        np.testing.assert_array_equal(self.model.beta, schedule[1])
+        self.model.clear_schedule('beta')
+        self.model.beta = 0.7
+        self.model.update(0.1)
+        np.testing.assert_array_equal(self.model.beta, np.full(3, 0.7))
+
+    def test_rejects_invalid_schedules(self) -> None:
+        with self.assertRaises(ValueError):
+            self.model.set_schedule('delta', [0.1])
+        with self.assertRaises(ValueError):
+            self.model.set_schedule('beta', np.ones((5, 2)))
+        with self.assertRaises(ValueError):
+            self.model.set_schedule('beta', [])
+
+    def test_rejects_other_dtypes(self) -> None:
+        with self.assertRaises(ValueError):
+            SEIR_batch(90, 5, 5, 0, 0.3, 0.1, 0.2, dtype=np.int32)
+
+    def test_rejects_mismatched_shapes(self) -> None:
+        with self.assertRaises(ValueError):
+            SEIR_batch([1, 2], [1, 2, 3], 1, 0, 0.3, 0.1, 0.2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+import unittest
+import numpy as np
+from comp_models import SEIR_model, SEIR_network
+from comp_models.seir_network import edges_to_csr
+
+class TestSEIRNetwork(unittest.TestCase):
+    '''Unit tests for the contact network SEIR model class'''
+
+    def setUp(self):
+        '''Method called to prepare the test fixture'''
+        # Ring of 200 nodes where every node also meets its second neighbour
+        self.num_nodes = 200
+        nodes = np.arange(self.num_nodes)
+        self.source = np.concatenate((nodes, nodes))
+        self.target = np.concatenate(((nodes + 1) % self.num_nodes, (nodes + 2) % self.num_nodes))
+        self.beta = 0.5
+        self.gamma = 1/10
+        self.sigma = 1/2.5
+        self.dt = 1
+
+    def test_edges_to_csr(self) -> None:
+        indptr, indices, weights = edges_to_csr(4, [0, 1, 2], [1, 2, 3], weights=[1.0, 2.0, 3.0])
+        np.testing.assert_array_equal(indptr, [0, 1, 3, 5, 6])
+        np.testing.assert_array_equal(indices, [1, 0, 2, 1, 3, 2])
+        np.testing.assert_array_equal(weights, [1.0, 1.0, 2.0, 2.0, 3.0, 3.0])
+        indptr, indices, _ = edges_to_csr(3, [0, 0], [1, 2], directed=True)
+        np.testing.assert_array_equal(indptr, [0, 0, 1, 2])
+        np.testing.assert_array_equal(indices, [0, 0])
+        with self.assertRaises(ValueError):
+            edges_to_csr(2, [0], [5])
+
+    def test_pressure_is_sparse_product(self) -> None:
+        model = SEIR_network.from_edges(self.num_nodes, self.source, self.target, E_start=None, I_start=[0, 1],
+                                        beta=self.beta, gamma=self.gamma, sigma=self.sigma)
+        dense = np.zeros((self.num_nodes, self.num_nodes))
+        dense[self.target, self.source] = 1
+        dense[self.source, self.target] = 1
+        infectious = np.zeros(self.num_nodes)
+        infectious[[0, 1]] = 1
+        np.testing.assert_allclose(model.pressure(), self.beta * dense @ infectious)
+
+    def test_mean_field_matches_homogeneous_model_on_complete_graph(self) -> None:
+        n = 100
+        source, target = np.meshgrid(np.arange(n), np.arange(n))
+        model = SEIR_network.from_edges(n, source.ravel(), target.ravel(), weights=np.full(n * n, 1 / n), directed=True,
+                                        E_start=np.arange(5), I_start=np.arange(5, 10),
+                                        beta=self.beta, gamma=self.gamma, sigma=self.sigma)
+        reference = SEIR_model(90, 5, 5, 0, self.beta, self.gamma, self.sigma)
+        dt = 0.05
+        for _ in range(int(60 / dt)):
+            model.update(dt)
+            reference.update(dt)
+        self.assertAlmostEqual(model.N, model.S + model.E + model.I + model.R, places=9)
+        self.assertAlmostEqual(model.R, reference.R, delta=1.0)
+        self.assertAlmostEqual(model.S, reference.S, delta=1.0)
+
+    def test_stochastic_mode_is_reproducible_and_conserves_nodes(self) -> None:
+        runs = []
+        for _ in range(2):
+            model = SEIR_network.from_edges(self.num_nodes, self.source, self.target, E_start=[10], I_start=[0],
+                                            beta=self.beta, gamma=self.gamma, sigma=self.sigma, mode='stochastic', seed=7)
+            S, E, I, R = model.simulate(150, self.dt)
+            np.testing.assert_array_equal(S + E + I + R, np.full(150, self.num_nodes))
+            self.assertTrue(np.all(np.diff(S) <= 0), "Susceptible population did not decrease")
+            self.assertTrue(np.all(np.diff(R) >= 0), "Recovered population did not increase")
+            runs.append(R)
+        np.testing.assert_array_equal(runs[0], runs[1])
+
+    def test_infection_stays_on_the_graph(self) -> None:
+        # Two disconnected components: the epidemic cannot cross over
+        model = SEIR_network.from_edges(4, [0, 2], [1, 3], E_start=None, I_start=[0],
+                                        beta=5.0, gamma=self.gamma, sigma=self.sigma, mode='stochastic', seed=1)
+        model.simulate(100, self.dt)
+        self.assertTrue(np.all(model.node_state[2:] == 0))
+
+    def test_rejects_unknown_mode(self) -> None:
+        with self.assertRaises(ValueError):
+            SEIR_network([0, 0], [], None, None, [0], self.beta, self.gamma, self.sigma, mode='exact')
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+import unittest
+import numpy as np
+from comp_models import SEIR_batch, SEIRV_batch
+
+class TestSEIRVBatch(unittest.TestCase):
+    '''Unit tests for the vectorized SEIRV/SEIRS model class'''
+
+    def setUp(self):
+        '''Method called to prepare the test fixture'''
+        self.S_0 = 54960
+        self.E_0 = 20
+        self.I_0 = 20
+        self.R_0 = 0
+        self.V_0 = 0
+        self.N = self.S_0 + self.E_0 + self.I_0 + self.R_0 + self.V_0
+        self.gamma = 1/10
+        self.beta = 3.03 * self.gamma
+        self.sigma = 1/2.5
+        self.dt = 1
+
+    def test_approaches_seir_without_vaccination_and_waning(self) -> None:
+        dt = 0.05
+        num_iter = int(300 / dt)
+        seir = SEIR_batch(self.S_0, self.E_0, self.I_0, self.R_0, self.beta, self.gamma, self.sigma)
+        seirv = SEIRV_batch(self.S_0, self.E_0, self.I_0, self.R_0, self.V_0, self.beta, self.gamma, self.sigma)
+        _, _, I_expected, R_expected = seir.simulate(num_iter, dt)
+        _, _, I, R, V = seirv.simulate(num_iter, dt)
+        self.assertAlmostEqual(I.max(), I_expected.max(), delta=0.01 * I_expected.max())
+        self.assertAlmostEqual(R[-1, 0], R_expected[-1, 0], delta=0.01 * R_expected[-1, 0])
+        np.testing.assert_array_equal(V, 0)
+
+    def test_population_is_conserved(self) -> None:
+        model = SEIRV_batch(self.S_0, self.E_0, self.I_0, self.R_0, self.V_0, self.beta, self.gamma, self.sigma,
+                            vaccination=[0, 200, 2000], omega=1/180)
+        for _ in range(365):
+            model.update(self.dt)
+            np.testing.assert_allclose(model.state.sum(axis=0), self.N, rtol=1e-9)
+            self.assertTrue(np.all(model.state >= 0), "Negative compartment")
+
+    def test_vaccination_capacity_limits_doses(self) -> None:
+        model = SEIRV_batch(1000, 0, 0, 0, 0, 0.0, self.gamma, self.sigma, vaccination=[0, 100, 400])
+        model.update(self.dt)
+        np.testing.assert_allclose(model.V, [0, 100, 400])
+        for _ in range(5):
+            model.update(self.dt)
+        np.testing.assert_allclose(model.V, [0, 600, 1000])
+        np.testing.assert_allclose(model.S, [1000, 400, 0])
+
+    def test_more_vaccination_lowers_the_peak(self) -> None:
+        model = SEIRV_batch(self.S_0, self.E_0, self.I_0, self.R_0, self.V_0, self.beta, self.gamma, self.sigma,
+                            vaccination=[0, 100, 500, 1000])
+        _, _, I, _, _ = model.simulate(365, self.dt)
+        peaks = I.max(axis=0)
+        self.assertTrue(np.all(np.diff(peaks) < 0), "Peak did not decrease with vaccination capacity")
+
+    def test_waning_immunity_gives_recurring_waves(self) -> None:
+        model = SEIRV_batch(self.S_0, self.E_0, self.I_0, self.R_0, self.V_0, self.beta, self.gamma, self.sigma,
+                            omega=[0, 1/90])
+        _, _, _, R, _ = model.simulate(730, self.dt)
+        self.assertGreater(R[-1, 0], R[-1, 1], "Waning immunity did not move people from R to S")
+
+    def test_rollout_schedules_are_applied_per_strategy(self) -> None:
+        days = 200
+        early = np.zeros(days)
+        early[20:] = 300
+        late = np.zeros(days)
+        late[80:] = 300
+        model = SEIRV_batch(self.S_0, self.E_0, self.I_0, self.R_0, self.V_0, self.beta, self.gamma, self.sigma,
+                            vaccination=[0, 0])
+        model.set_schedule('vaccination', np.stack((early, late), axis=1))
+        model.set_schedule('omega', np.full(days, 1/365))
+        _, _, I, _, V = model.simulate(days, self.dt)
+        self.assertEqual(V[20, 0], 0)
+        self.assertAlmostEqual(V[21, 0], 300)
+        self.assertEqual(V[80, 1], 0)
+        self.assertLess(I.max(axis=0)[0], I.max(axis=0)[1], "Earlier rollout did not lower the peak")
+        np.testing.assert_array_equal(model.omega, np.full(2, 1/365))
+
+
+if __name__ == "__main__":
+    unittest.main()
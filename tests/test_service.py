@@ -0,0 +1,185 @@
+import asyncio
+import os
+import tempfile
+import unittest
+from unittest import mock
+from comp_models import SEIR_model
+from comp_models.service import ScenarioService, http_request, parse_scenario
+
+SCENARIO = {'S_start': 3689, 'E_start': 10, 'I_start': 1, 'R0': 4.9, 'gamma': 1/14, 'sigma': 1/3, 't_max': 90}
+
+class TestScenarioService(unittest.TestCase):
+    '''Unit tests for the micro-batching scenario service'''
+
+    def test_parse_scenario(self) -> None:
+        scenario = parse_scenario(SCENARIO)
+        self.assertAlmostEqual(scenario['beta'], 4.9 / 14)
+        self.assertEqual(scenario['dt'], 1.0)
+        with self.assertRaises(ValueError):
+            parse_scenario({'S_start': 10})
+        with self.assertRaises(ValueError):
+            parse_scenario(dict(SCENARIO, dt=0))
+        for bad in (float('nan'), float('inf'), 1e400):
+            with self.assertRaises(ValueError):
+                parse_scenario(dict(SCENARIO, t_max=bad))
+        with self.assertRaises(ValueError):
+            parse_scenario(dict(SCENARIO, gamma=float('nan')))
+        with self.assertRaises(ValueError):
+            parse_scenario(dict(SCENARIO, t_max=1000, dt=0.01), max_steps=10000)
+        for bad in ({'S_start': 0, 'E_start': 0, 'I_start': 0}, {'I_start': -1}, {'gamma': -0.1},
+                    {'sigma': -1}, {'R0': -2}, {'beta': -0.3}):
+            with self.assertRaises(ValueError, msg=bad):
+                parse_scenario(dict(SCENARIO, **bad))
+
+    def test_bad_scenario_does_not_fail_its_batch(self) -> None:
+        async def scenario():
+            service = ScenarioService(window=0.05, max_steps=1000)
+            results = await asyncio.gather(service.submit(SCENARIO), service.submit(dict(SCENARIO, t_max=float('nan'))),
+                                           service.submit(dict(SCENARIO, t_max=1e6)), return_exceptions=True)
+            await service.close()
+            return results
+
+        good, nan, huge = asyncio.run(scenario())
+        self.assertEqual(len(good['I']), 90)
+        self.assertIsInstance(nan, ValueError)
+        self.assertIsInstance(huge, ValueError)
+
+    def test_concurrent_requests_are_batched(self) -> None:
+        async def scenario():
+            service = ScenarioService(window=0.05)
+            requests = [dict(SCENARIO, R0=1 + i / 10, t_max=40 + i) for i in range(20)]
+            results = await asyncio.gather(*(service.submit(r) for r in requests))
+            metrics = service.metrics()
+            await service.close()
+            return results, metrics
+
+        results, metrics = asyncio.run(scenario())
+        self.assertEqual(metrics['batches'], 1)
+        self.assertEqual(metrics['batch_size_max'], 20)
+        self.assertEqual(metrics['requests'], 20)
+        self.assertGreater(metrics['latency_ms_max'], 0)
+        for i, result in enumerate(results):
+            self.assertEqual(len(result['I']), 40 + i)
+        model = SEIR_model(3689, 10, 1, 0, 1.5 / 14, 1 / 14, 1 / 3)
+        for _ in range(44):
+            model.update(1)
+        self.assertAlmostEqual(results[5]['I'][-1], model.I, places=9)
+
+    def test_long_scenario_does_not_delay_short_ones(self) -> None:
+        async def scenario():
+            service = ScenarioService(window=0.05)
+            long_task = asyncio.ensure_future(service.submit(dict(SCENARIO, t_max=20000)))
+            short = await asyncio.gather(*(service.submit(dict(SCENARIO, R0=1 + i / 10)) for i in range(10)))
+            long_done = long_task.done()
+            long_result = await long_task
+            metrics = service.metrics()
+            await service.close()
+            return short, long_done, long_result, metrics
+
+        short, long_done, long_result, metrics = asyncio.run(scenario())
+        self.assertFalse(long_done)
+        self.assertEqual([len(result['I']) for result in short], [90] * 10)
+        self.assertEqual(len(long_result['I']), 20000)
+        self.assertEqual(metrics['batches'], 2)
+        self.assertEqual(metrics['batch_size_max'], 10)
+
+    def test_max_batch_splits_batches(self) -> None:
+        async def scenario():
+            service = ScenarioService(window=10, max_batch=4)
+            await asyncio.gather(*(service.submit(SCENARIO) for _ in range(8)))
+            metrics = service.metrics()
+            await service.close()
+            return metrics
+
+        metrics = asyncio.run(scenario())
+        self.assertEqual(metrics['batches'], 2)
+        self.assertEqual(metrics['batch_size_mean'], 4)
+
+    def test_http_round_trip(self) -> None:
+        async def scenario():
+            service = ScenarioService(window=0.01)
+            server = await service.serve_http('127.0.0.1', 0)
+            port = server.sockets[0].getsockname()[1]
+            responses = await asyncio.gather(*(http_request('POST', '/simulate', SCENARIO, port=port) for _ in range(5)))
+            bad = await http_request('POST', '/simulate', {'S_start': 1}, port=port)
+            nan = await http_request('POST', '/simulate', dict(SCENARIO, t_max=float('nan')), port=port)
+            empty = await http_request('POST', '/simulate', dict(SCENARIO, S_start=0, E_start=0, I_start=0), port=port)
+            negative = await http_request('POST', '/simulate', dict(SCENARIO, gamma=-0.1), port=port)
+            missing = await http_request('GET', '/nowhere', port=port)
+            metrics = await http_request('GET', '/metrics', port=port)
+            server.close()
+            await server.wait_closed()
+            await service.close()
+            return responses, bad, nan, empty, negative, missing, metrics
+
+        responses, bad, nan, empty, negative, missing, metrics = asyncio.run(scenario())
+        for status, result in responses:
+            self.assertEqual(status, 200)
+            self.assertEqual(len(result['S']), 90)
+        self.assertEqual(bad[0], 400)
+        self.assertEqual(nan[0], 400)
+        self.assertEqual(empty[0], 400)
+        self.assertEqual(negative[0], 400)
+        self.assertEqual(missing[0], 404)
+        self.assertEqual(metrics[0], 200)
+        self.assertEqual(metrics[1]['requests'], 5)
+
+    def test_worker_errors_become_500(self) -> None:
+        def broken(scenarios):
+            raise MemoryError("out of memory")
+
+        async def scenario():
+            service = ScenarioService(window=0.01)
+            server = await service.serve_http('127.0.0.1', 0)
+            port = server.sockets[0].getsockname()[1]
+            with mock.patch('comp_models.service.run_batch', broken):
+                response = await http_request('POST', '/simulate', SCENARIO, port=port)
+            server.close()
+            await server.wait_closed()
+            metrics = service.metrics()
+            await service.close()
+            return response, metrics
+
+        (status, payload), metrics = asyncio.run(scenario())
+        self.assertEqual(status, 500)
+        self.assertIn('MemoryError', payload['error'])
+        self.assertEqual(metrics['failures'], 1)
+
+    def test_non_finite_results_become_500(self) -> None:
+        def diverged(scenarios):
+            return [{'S': [float('nan')], 'E': [0.0], 'I': [float('inf')], 'R': [0.0]} for _ in scenarios]
+
+        async def scenario():
+            service = ScenarioService(window=0.01)
+            server = await service.serve_http('127.0.0.1', 0)
+            port = server.sockets[0].getsockname()[1]
+            with mock.patch('comp_models.service.run_batch', diverged):
+                response = await http_request('POST', '/simulate', SCENARIO, port=port)
+            server.close()
+            await server.wait_closed()
+            await service.close()
+            return response
+
+        status, payload = asyncio.run(scenario())
+        self.assertEqual(status, 500)
+        self.assertIn('error', payload)
+
+    @unittest.skipUnless(hasattr(asyncio, 'open_unix_connection'), "Unix sockets not available")
+    def test_unix_socket_round_trip(self) -> None:
+        async def scenario(path: str):
+            service = ScenarioService(window=0.01)
+            server = await service.serve_unix(path)
+            response = await http_request('POST', '/simulate', SCENARIO, unix_path=path)
+            server.close()
+            await server.wait_closed()
+            await service.close()
+            return response
+
+        with tempfile.TemporaryDirectory() as tmp:
+            status, result = asyncio.run(scenario(os.path.join(tmp, 'seir.sock')))
+        self.assertEqual(status, 200)
+        self.assertEqual(len(result['R']), 90)
+
+
+if __name__ == "__main__":
+    unittest.main()
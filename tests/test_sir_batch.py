@@ -0,0 +1,58 @@
+import unittest
+import numpy as np
+from comp_models import SIR_batch, SIR_model
+
+class TestSIRBatch(unittest.TestCase):
+    '''Unit tests for the vectorized SIR model class'''
+
+    def setUp(self):
+        '''Method called to prepare the test fixture'''
+        self.S_0 = np.array([95, 990, 9900])
+        self.I_0 = np.array([5, 10, 100])
+        self.R_0 = 0
+        self.beta = np.array([1/3, 0.5, 0.25])
+        self.gamma = 1/10
+        self.I_threshold = np.array([0, 2, 10])
+        self.dt = 1
+
+        self.model = SIR_batch(self.S_0, self.I_0, self.R_0, self.beta, self.gamma, self.I_threshold)
+
+    def test_can_construct(self) -> None:
+        self.assertEqual(self.model.size, 3)
+        self.assertEqual(self.model.state.shape, (3, 3))
+        np.testing.assert_array_equal(self.model.I, self.I_0)
+        np.testing.assert_array_equal(self.model.N, self.S_0 + self.I_0)
+
+    def test_columns_match_scalar_model(self) -> None:
+        S, I, R = self.model.simulate(200, self.dt)
+        for k in range(3):
+            model = SIR_model(self.S_0[k], self.I_0[k], self.R_0, self.beta[k], self.gamma, self.I_threshold[k])
+            for i in range(1, 200):
+                model.update(self.dt)
+                self.assertAlmostEqual(S[i, k], model.S, places=9)
+                self.assertAlmostEqual(I[i, k], model.I, places=9)
+                self.assertAlmostEqual(R[i, k], model.R, places=9)
+
+    def test_float32_stays_close_to_float64(self) -> None:
+        model32 = SIR_batch(self.S_0, self.I_0, self.R_0, self.beta, self.gamma, self.I_threshold, dtype='float32')
+        S32, I32, _ = model32.simulate(200, self.dt)
+        S64, I64, _ = self.model.simulate(200, self.dt)
+        self.assertEqual(S32.dtype, np.float32)
+        np.testing.assert_allclose(S32, S64, rtol=1e-4, atol=1e-3)
+        np.testing.assert_allclose(I32, I64, rtol=1e-4, atol=1e-3)
+
+    def test_schedule_matches_setting_beta_in_a_loop(self) -> None:
+        R0 = np.array([3.0, 3.0, 0.8, 1.2])
+        reference = SIR_batch(self.S_0, self.I_0, self.R_0, self.beta, self.gamma, self.I_threshold)
+        for day in range(30):
+            reference.beta = R0[min(day, len(R0) - 1)] * self.gamma
+            reference.update(self.dt)
+        self.model.set_schedule('beta', R0 * self.gamma)
+        self.model.simulate(31, self.dt)
+        np.testing.assert_array_equal(self.model.state, reference.state)
+        with self.assertRaises(ValueError):
+            self.model.set_schedule('sigma', [0.1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+from comp_models import SEIR_model, SEIR_surrogate
+from comp_models.surrogate import OUTPUTS, summarise
+
+class TestSEIRSurrogate(unittest.TestCase):
+    '''Unit tests for the SEIR surrogate grid'''
+
+    @classmethod
+    def setUpClass(cls):
+        '''A class method called before tests in an individual class are run'''
+        cls.surrogate = SEIR_surrogate.build(np.linspace(2, 4, 21), np.linspace(1/14, 1/7, 8), np.linspace(1/5, 1/2, 8),
+                                             S_start=3689, E_start=10, I_start=1, t_max=120)
+
+    def test_summaries_match_the_model(self) -> None:
+        model = SEIR_model(3689, 10, 1, 0, 3 * 0.1, 0.1, 0.25)
+        I = [model.I]
+        for _ in range(119):
+            model.update(1)
+            I.append(model.I)
+        peak_I, peak_day, final_size = summarise(3, 0.1, 0.25, self.surrogate.scenario)[0]
+        self.assertAlmostEqual(peak_I, max(I), places=6)
+        self.assertEqual(peak_day, I.index(max(I)))
+        self.assertAlmostEqual(final_size, model.N - model.S, places=6)
+
+    def test_grid_nodes_are_reproduced(self) -> None:
+        axes = self.surrogate.axes
+        point = [axes['R0'][5], axes['gamma'][3], axes['sigma'][4]]
+        values, _, inside = self.surrogate.interpolate([point])
+        self.assertTrue(inside[0])
+        np.testing.assert_allclose(values[0], summarise(*point, self.surrogate.scenario)[0], rtol=1e-6)
+
+    def test_query_inside_the_grid_is_within_the_error_estimate(self) -> None:
+        result = self.surrogate.query(3.13, 0.1, 0.31, rtol=None)
+        self.assertEqual(result['source'], 'grid')
+        exact = self.surrogate.simulate(3.13, 0.1, 0.31)
+        for name in OUTPUTS:
+            self.assertLessEqual(abs(result[name] - exact[name]), result['error_estimate'][name], name)
+
+    def test_falls_back_to_simulation(self) -> None:
+        outside = self.surrogate.query(4.5, 0.1, 0.31)
+        self.assertEqual(outside['source'], 'simulation')
+        self.assertEqual(outside['error_estimate'], dict.fromkeys(OUTPUTS, 0.0))
+        self.assertEqual(outside['peak_I'], self.surrogate.simulate(4.5, 0.1, 0.31)['peak_I'])
+        self.assertEqual(self.surrogate.query(3.13, 0.1, 0.31, rtol=0.0)['source'], 'simulation')
+
+    def test_save_and_load_memory_mapped(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'grid')
+            self.surrogate.save(path)
+            loaded = SEIR_surrogate.load(path)
+            self.assertIsInstance(loaded.values, np.memmap)
+            self.assertEqual(loaded.values.dtype, np.float32)
+            self.assertEqual(loaded.query(3.13, 0.1, 0.31, rtol=None), self.surrogate.query(3.13, 0.1, 0.31, rtol=None))
+            del loaded
+
+    def test_rejects_invalid_grids(self) -> None:
+        with self.assertRaises(ValueError):
+            SEIR_surrogate([[1, 2], [0.1], [0.2, 0.3]], np.zeros((2, 1, 2, 3)), np.zeros((1, 0, 1, 3)), self.surrogate.scenario)
+        with self.assertRaises(ValueError):
+            SEIR_surrogate([[2, 1], [0.1, 0.2], [0.2, 0.3]], np.zeros((2, 2, 2, 3)), np.zeros((1, 1, 1, 3)), self.surrogate.scenario)
+
+
+if __name__ == "__main__":
+    unittest.main()